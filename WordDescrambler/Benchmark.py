@@ -0,0 +1,283 @@
+"""
+A reproducible benchmark suite for WordDescramblerCore.
+
+Every search backend is timed against synthetic wordlists (and the NLTK corpora when they are installed locally),
+sweeping candidate length, use_all_letters and the worker count. Nothing is downloaded, and the same seed always
+produces the same wordlists and candidates, so two runs on one machine can be compared directly.
+
+The report is machine-readable JSON. Each result holds the throughput, the p50/p99 latency and the peak memory
+of one combination of settings.
+
+Example usage:
+```
+python Benchmark.py --sizes 10000 100000 --output benchmark.json
+python Benchmark.py --backends numpy trie --candidate-lengths 6 12 --repeats 20
+```
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from logging import getLogger
+from os import cpu_count
+
+from SearchBackends import NumpySearchBackend, ProcessPoolSearchBackend
+from WordDescramblerCore import WordDescramblerCore
+
+
+class Benchmark:
+    """
+    Times WordDescramblerCore searches over a grid of settings and collects the results as a JSON-ready dict.
+
+    One WordDescramblerCore is built per wordlist and reused for every query against it, so index building
+    is measured once per wordlist and kept out of the query latencies. A query is timed from the start of the
+    search to the last match found. Writing the runtime file is not included.
+
+    Peak memory is measured with tracemalloc on one extra query per combination, so tracing does not slow down
+    the timed queries. It covers allocations in this process only, not in the workers of the process backend.
+
+    Each result names the backend that was asked for and the one that ran ('resolved_backend'): 'auto' resolves
+    by candidate length, and use_all_letters queries are answered by the signature index whatever the backend.
+
+    Attributes:
+        DEFAULT_SIZES (tuple): The synthetic wordlist sizes used when none are given.
+        DEFAULT_CANDIDATE_LENGTHS (tuple): The candidate lengths used when none are given.
+        DEFAULT_WORKER_COUNTS (tuple): The num_threads / num_processes values used when none are given.
+        WORKER_BACKENDS (tuple): The backends whose speed depends on the worker count.
+        LETTER_FREQUENCIES (dict): The relative frequency of each letter in English text.
+        sizes (list): The synthetic wordlist sizes to benchmark.
+        candidate_lengths (list): The candidate lengths to sweep. Lengths above MAX_CANDIDATE_LENGTH are dropped.
+        worker_counts (list): The worker counts to sweep for the WORKER_BACKENDS.
+        backends (list): The search backends to benchmark.
+        repeats (int): The number of timed queries per combination.
+        seed (int): The seed for the wordlists and candidates.
+        include_nltk (bool): Whether to benchmark the NLTK corpora too, when they are installed.
+
+    Methods:
+        synthetic_wordlist(size): Return a reproducible wordlist of random, English-like words.
+        candidates(length, count): Return reproducible candidate strings of one length.
+        run(): Run every combination and return the report.
+        bench_wordlist(name, words): Run every combination against one wordlist.
+        bench_case(wd, candidates, backend, use_all_letters, workers): Time one combination.
+    """
+    DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+    DEFAULT_CANDIDATE_LENGTHS = (4, 8, 16, 64, 512, WordDescramblerCore.MAX_CANDIDATE_LENGTH)
+    DEFAULT_WORKER_COUNTS = (1, 2, 4, 8)
+    WORKER_BACKENDS = ('python', 'process')
+    LETTER_FREQUENCIES = {'a': 8.2, 'b': 1.5, 'c': 2.8, 'd': 4.3, 'e': 12.7, 'f': 2.2, 'g': 2.0, 'h': 6.1,
+                          'i': 7.0, 'j': 0.15, 'k': 0.77, 'l': 4.0, 'm': 2.4, 'n': 6.7, 'o': 7.5, 'p': 1.9,
+                          'q': 0.095, 'r': 6.0, 's': 6.3, 't': 9.1, 'u': 2.8, 'v': 0.98, 'w': 2.4, 'x': 0.15,
+                          'y': 2.0, 'z': 0.074}
+
+    def __init__(self, **kwargs):
+        self.logger = kwargs.get('logger', getLogger('dummy_logger'))
+        self.sizes = list(kwargs.get('sizes', self.DEFAULT_SIZES))
+        self.candidate_lengths = [length for length in kwargs.get('candidate_lengths', self.DEFAULT_CANDIDATE_LENGTHS)
+                                  if length <= WordDescramblerCore.MAX_CANDIDATE_LENGTH]
+        self.worker_counts = list(kwargs.get('worker_counts', self.DEFAULT_WORKER_COUNTS))
+        self.backends = list(kwargs.get('backends', WordDescramblerCore.SEARCH_BACKENDS))
+        self.repeats = kwargs.get('repeats', 5)
+        self.seed = kwargs.get('seed', 0)
+        self.include_nltk = kwargs.get('include_nltk', True)
+        if NumpySearchBackend.NAME in self.backends and not NumpySearchBackend.is_available():
+            self.logger.warning('numpy is not installed, so the numpy backend is not benchmarked.')
+            self.backends.remove(NumpySearchBackend.NAME)
+
+    def synthetic_wordlist(self, size: int) -> set:
+        """
+        :param size: The number of distinct words to generate.
+        :return: A set of random words of 2 to 15 letters, drawn with English letter frequencies.
+        """
+        rng = random.Random(f'{self.seed}-wordlist-{size}')
+        letters, weights = list(self.LETTER_FREQUENCIES), list(self.LETTER_FREQUENCIES.values())
+        words = set()
+        while len(words) < size:
+            words.add(''.join(rng.choices(letters, weights, k=rng.randint(2, 15))))
+        return words
+
+    def candidates(self, length: int, count: int) -> list:
+        """
+        :return: count random candidate strings of the given length, drawn with English letter frequencies.
+        """
+        rng = random.Random(f'{self.seed}-candidates-{length}')
+        letters, weights = list(self.LETTER_FREQUENCIES), list(self.LETTER_FREQUENCIES.values())
+        return [''.join(rng.choices(letters, weights, k=length)) for _ in range(count)]
+
+    def _nltk_wordlists(self) -> dict:
+        """
+        :return: The NLTK corpora that are installed locally, by name. Nothing is downloaded.
+        """
+        try:
+            nltk_words = WordDescramblerCore._nltk_words()
+            return {'nltk-en-basic': {w.lower() for w in nltk_words.words('en-basic')},
+                    'nltk-words': {w.lower() for w in nltk_words.words()}}
+        except (ImportError, LookupError) as e:
+            self.logger.warning(f'skipping the NLTK wordlists: {e}')
+            return {}
+
+    def run(self) -> dict:
+        """
+        :return: The report: the environment, the settings, one entry per wordlist and one result per combination.
+        """
+        report = {'environment': self._environment(),
+                  'settings': {'sizes': self.sizes, 'candidate_lengths': self.candidate_lengths,
+                               'worker_counts': self.worker_counts, 'backends': self.backends,
+                               'repeats': self.repeats, 'seed': self.seed},
+                  'wordlists': [],
+                  'results': []}
+        wordlists = {f'synthetic-{size}': lambda size=size: self.synthetic_wordlist(size) for size in self.sizes}
+        if self.include_nltk:
+            wordlists.update({name: lambda words=words: words for name, words in self._nltk_wordlists().items()})
+        for name, build_words in wordlists.items():
+            wordlist_info, results = self.bench_wordlist(name, build_words())
+            report['wordlists'].append(wordlist_info)
+            report['results'].extend(results)
+        report['environment']['max_rss_kb'] = self._max_rss_kb()
+        return report
+
+    def bench_wordlist(self, name: str, words: set) -> tuple:
+        """
+        :param name: The name the wordlist is reported under.
+        :param words: The words of the wordlist.
+        :return: The wordlist entry of the report (size, index build time and peak memory)
+            and the results of every combination run against it.
+        """
+        wd = WordDescramblerCore(logger=self.logger, result_cache_size=0, result_cache_path='',
+                                 print_matches=False, verbose_mode=False)
+        wd.wordlist = words
+        tracemalloc.start()
+        build_start = time.perf_counter()
+        index = wd.index
+        build_seconds = time.perf_counter() - build_start
+        build_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        wordlist_info = {'name': name, 'size': len(index), 'index_build_seconds': build_seconds,
+                         'index_build_peak_memory_bytes': build_peak}
+        self.logger.info(f'benchmarking {name} ({len(index):,} words).')
+
+        results = []
+        try:
+            for length in self.candidate_lengths:
+                candidates = self.candidates(length, self.repeats)
+                for use_all_letters in (False, True):
+                    for backend in self.backends:
+                        for workers in (self.worker_counts if backend in self.WORKER_BACKENDS else [None]):
+                            result = self.bench_case(wd, candidates, backend, use_all_letters, workers)
+                            results.append({'wordlist': name, **result})
+        finally:
+            wd.close()
+        return wordlist_info, results
+
+    def bench_case(self, wd: WordDescramblerCore, candidates: list, backend: str, use_all_letters: bool,
+                   workers: int or None) -> dict:
+        """
+        Time one combination of settings.
+
+        :param wd: The WordDescramblerCore holding the wordlist.
+        :param candidates: The candidate strings to search, one timed query each.
+        :param backend: The search backend.
+        :param use_all_letters: Whether matches must use every candidate letter.
+        :param workers: The num_threads (python backend) or num_processes (process backend), or None.
+        :return: The settings, throughput, latency percentiles and peak memory of the combination.
+        """
+        wd._search_backend = backend
+        wd._use_all_letters = use_all_letters
+        if workers is not None:
+            wd.num_threads = workers
+            if backend == ProcessPoolSearchBackend.NAME and wd.num_processes != workers:
+                # only the pool depends on the worker count; closing the whole core would drop the index too
+                wd.close_pool()
+                wd.num_processes = workers
+
+        # one untimed query, traced for peak memory; it also starts the process pool and builds the numpy matrix
+        tracemalloc.start()
+        self._query(wd, candidates[0])
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        latencies = []
+        matches = 0
+        for candidate in candidates:
+            start = time.perf_counter()
+            matches += self._query(wd, candidate)
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        total = sum(latencies)
+        result = {'candidate_length': len(candidates[0]), 'use_all_letters': use_all_letters, 'backend': backend,
+                  'resolved_backend': 'signature' if use_all_letters else wd.search_backend, 'workers': workers, 'queries': len(latencies),
+                  'mean_matches': matches / len(latencies),
+                  'throughput_qps': len(latencies) / total if total else None,
+                  'latency_seconds': {'p50': self._percentile(latencies, 0.50),
+                                      'p99': self._percentile(latencies, 0.99),
+                                      'mean': total / len(latencies), 'max': latencies[-1]},
+                  'peak_memory_bytes': peak_memory}
+        self.logger.info(f'{result["candidate_length"]} letters, use_all_letters={use_all_letters}, {backend}, '
+                         f'workers={workers}: p50 {result["latency_seconds"]["p50"] * 1000:.2f} ms')
+        return result
+
+    @staticmethod
+    def _query(wd: WordDescramblerCore, candidate: str) -> int:
+        """
+        :return: The number of matches for the candidate.
+        """
+        wd.candidate_letters = candidate
+        wd.match_list = set()
+        wd._run_search()
+        return len(wd.match_list)
+
+    @staticmethod
+    def _percentile(sorted_values: list, fraction: float) -> float:
+        """
+        :return: The nearest-rank percentile of an already sorted list.
+        """
+        rank = max(-(-len(sorted_values) * fraction // 1), 1)
+        return sorted_values[int(rank) - 1]
+
+    @staticmethod
+    def _max_rss_kb() -> int or None:
+        try:
+            import resource
+        except ImportError:
+            return None
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    @staticmethod
+    def _environment() -> dict:
+        return {'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'python': sys.version.split()[0], 'implementation': platform.python_implementation(),
+                'platform': platform.platform(), 'cpu_count': cpu_count(),
+                'numpy_available': NumpySearchBackend.is_available()}
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the WordDescrambler search backends.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=Benchmark.DEFAULT_SIZES,
+                        help='synthetic wordlist sizes')
+    parser.add_argument('--candidate-lengths', type=int, nargs='+', default=Benchmark.DEFAULT_CANDIDATE_LENGTHS,
+                        help='candidate string lengths')
+    parser.add_argument('--workers', type=int, nargs='+', default=Benchmark.DEFAULT_WORKER_COUNTS,
+                        help='num_threads / num_processes values for the python and process backends')
+    parser.add_argument('--backends', nargs='+', default=WordDescramblerCore.SEARCH_BACKENDS,
+                        choices=WordDescramblerCore.SEARCH_BACKENDS)
+    parser.add_argument('--repeats', type=int, default=5, help='timed queries per combination')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-nltk', action='store_true', help='skip the NLTK corpora even if they are installed')
+    parser.add_argument('--output', help='write the JSON report here instead of to stdout')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = _parse_args()
+    report = Benchmark(sizes=args.sizes, candidate_lengths=args.candidate_lengths, worker_counts=args.workers,
+                       backends=args.backends, repeats=args.repeats, seed=args.seed,
+                       include_nltk=not args.no_nltk).run()
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=4)
+        print(f"benchmark report written to {args.output}")
+    else:
+        print(json.dumps(report, indent=4))
@@ -0,0 +1,348 @@
+"""
+A long-running local descrambler service that keeps one loaded index warm and answers queries as JSON over HTTP.
+
+Example usage:
+```
+python DescramblerServer.py --port 8765
+curl 'http://127.0.0.1:8765/search?letters=listen&min_match_length=4'
+curl -X POST -d '{"candidates": ["listen", "silent", "tinsel"]}' http://127.0.0.1:8765/search
+curl http://127.0.0.1:8765/stats
+
+python DescramblerServer.py --unix-socket /tmp/descrambler.sock
+curl --unix-socket /tmp/descrambler.sock 'http://localhost/search?letters=listen'
+```
+"""
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qs
+
+import click
+
+from WordIndex import WordIndex
+from Scoring import SCORERS
+from WordDescramblerCore import WordDescramblerCore
+from word_descrambler import backend_option, config_option, core_options, wordlist_option
+
+
+class RequestError(Exception):
+    """
+    A request the server rejects, answered with `status` and the error message.
+    """
+    def __init__(self, message: str, status: HTTPStatus = HTTPStatus.BAD_REQUEST):
+        super().__init__(message)
+        self.status = status
+
+
+class DescramblerServer:
+    """
+    An asyncio HTTP/1.1 front end for one WordDescramblerCore, listening on a local TCP port or a Unix socket.
+
+    The index is loaded once, before the first connection is accepted, so queries only pay for the search itself.
+    Searches run on a thread pool through WordDescramblerCore.search_many, which leaves the core's match_list and
+    runtime file alone and goes through its result cache. Concurrent requests for the same letters (including
+    anagrams of each other) with the same options are coalesced: one search runs and every request gets its result.
+
+    Endpoints:
+        GET /search?letters=...&use_all_letters=...&min_match_length=...&limit_length=...: The sorted matches.
+            With top_k=... (and optionally scorer=...), only the best top_k matches, best first, with their scores.
+        POST /search with a JSON object of the same fields, or with "candidates" (a list) for a batch.
+        GET /stats: Request, coalescing, latency and cache numbers.
+        GET /health: {"status": "ok"} once the index is loaded.
+
+    Attributes:
+        LATENCY_WINDOW (int): How many recent request latencies the stats percentiles cover.
+        MAX_BODY_BYTES (int): The largest request body accepted.
+        core (WordDescramblerCore): The descrambler holding the index.
+        host (str): The TCP host to listen on.
+        port (int): The TCP port to listen on.
+        unix_socket (str): A Unix socket path to listen on instead of TCP, or '' for TCP.
+        max_workers (int): The number of search threads.
+        requests (int): Requests answered.
+        errors (int): Requests answered with an error.
+        searches (int): Searches run. Lower than the search requests when requests are coalesced or batched.
+        coalesced (int): Requests answered by a search another request had already started.
+
+    Methods:
+        start(): Load the index and start listening.
+        serve_forever(): Start and serve until cancelled.
+        stats(): Return the numbers served by /stats.
+        close(): Stop listening and shut down the search threads.
+    """
+    LATENCY_WINDOW = 10_000
+    MAX_BODY_BYTES = 1 << 20
+
+    def __init__(self, core: WordDescramblerCore, **kwargs):
+        self.logger = kwargs.get('logger', core.logger)
+        self.core = core
+        self.host = kwargs.get('host', core.config.get('SERVER', 'host'))
+        self.port = kwargs.get('port', core.config.getint('SERVER', 'port'))
+        self.unix_socket = kwargs.get('unix_socket', core.config.get('SERVER', 'unix_socket'))
+        self.max_workers = kwargs.get('max_workers', core.num_threads)
+        self.requests = 0
+        self.errors = 0
+        self.searches = 0
+        self.coalesced = 0
+        self._latencies = deque(maxlen=self.LATENCY_WINDOW)
+        self._in_flight = {}
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='descrambler-search')
+        self._server = None
+        self._started = None
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        load_start = time.perf_counter()
+        index = await loop.run_in_executor(self._executor, lambda: self.core.index)
+        self.logger.info(f'index of {len(index):,} words warm in {time.perf_counter() - load_start:.2f} seconds.')
+        if self.unix_socket:
+            self._server = await asyncio.start_unix_server(self._handle_connection, path=self.unix_socket)
+            self.logger.info(f'listening on {self.unix_socket}')
+        else:
+            self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+            self.port = self._server.sockets[0].getsockname()[1]
+            self.logger.info(f'listening on http://{self.host}:{self.port}')
+        self._started = time.monotonic()
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                                        {'error': 'request head too large'}, keep_alive=False)
+                    break
+                keep_alive = await self._handle_request(head, reader, writer)
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def _handle_request(self, head: bytes, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+        """
+        Answer one request.
+
+        :return: True if the connection should be kept open for another request.
+        """
+        start = time.perf_counter()
+        request_line, *header_lines = head.decode('latin-1').rstrip('\r\n').split('\r\n')
+        headers = {}
+        for line in header_lines:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        try:
+            method, target, version = request_line.split(' ')
+        except ValueError:
+            await self._respond(writer, HTTPStatus.BAD_REQUEST, {'error': 'malformed request line'}, keep_alive=False)
+            return False
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            length = -1
+        if not 0 <= length <= self.MAX_BODY_BYTES:
+            await self._respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {'error': 'bad request body length'},
+                                keep_alive=False)
+            return False
+        try:
+            body = await reader.readexactly(length) if length else b''
+        except asyncio.IncompleteReadError:
+            return False
+
+        self.requests += 1
+        try:
+            status, payload = HTTPStatus.OK, await self._route(method, target, body)
+        except RequestError as e:
+            status, payload = e.status, {'error': str(e)}
+        except Exception as e:
+            self.logger.error(f'{method} {target} failed: {e}')
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)}
+        if status != HTTPStatus.OK:
+            self.errors += 1
+        await self._respond(writer, status, payload, keep_alive)
+        self._latencies.append(time.perf_counter() - start)
+        return keep_alive
+
+    async def _route(self, method: str, target: str, body: bytes) -> dict:
+        url = urlsplit(target)
+        if url.path == '/search':
+            if method == 'GET':
+                params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+            elif method == 'POST':
+                try:
+                    params = json.loads(body or b'{}')
+                except ValueError:
+                    raise RequestError('the request body is not valid JSON')
+                if not isinstance(params, dict):
+                    raise RequestError('the request body must be a JSON object')
+            else:
+                raise RequestError(f'{method} is not allowed', HTTPStatus.METHOD_NOT_ALLOWED)
+            return await self._search(params)
+        if method != 'GET':
+            raise RequestError(f'{method} is not allowed', HTTPStatus.METHOD_NOT_ALLOWED)
+        if url.path == '/stats':
+            return self.stats()
+        if url.path == '/health':
+            return {'status': 'ok'}
+        raise RequestError(f'{url.path} not found', HTTPStatus.NOT_FOUND)
+
+    @staticmethod
+    def _flag(value) -> bool:
+        if isinstance(value, bool):
+            return value
+        return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+
+    def _search_options(self, params: dict) -> dict:
+        options = {}
+        try:
+            if 'use_all_letters' in params:
+                options['use_all_letters'] = self._flag(params['use_all_letters'])
+            for name in ('min_match_length', 'limit_length'):
+                if name in params:
+                    options[name] = int(params[name])
+            if 'top_k' in params:
+                options['top_k'] = int(params['top_k'])
+        except (TypeError, ValueError):
+            raise RequestError('min_match_length, limit_length and top_k must be integers')
+        if 'top_k' in options and options['top_k'] < 1:
+            raise RequestError('top_k must be at least 1')
+        if 'scorer' in params:
+            if params['scorer'] not in SCORERS:
+                raise RequestError(f"scorer must be one of {', '.join(SCORERS)}")
+            options['scorer'] = params['scorer']
+        if 'top_k' in options:
+            try:
+                self.core.get_scorer(options['scorer']) if 'scorer' in options else self.core.scorer
+            except ValueError as e:
+                raise RequestError(str(e))
+        return options
+
+    @staticmethod
+    def _ranked(matches) -> bool:
+        # top_matches returns a ranked list of (word, score) pairs, search_many a set of words
+        return isinstance(matches, list)
+
+    def _candidates(self, params: dict) -> list:
+        candidates = params.get('candidates')
+        if candidates is None:
+            candidates = [params.get('letters')]
+        if not isinstance(candidates, list) or not all(isinstance(letters, str) and letters for letters in candidates):
+            raise RequestError("give the candidate letters as 'letters' or as a 'candidates' list of strings")
+        for letters in candidates:
+            if len(letters) > self.core.MAX_CANDIDATE_LENGTH:
+                raise RequestError(f'Too many candidate letters. Max characters supported is '
+                                   f'{self.core.MAX_CANDIDATE_LENGTH}')
+        return candidates
+
+    async def _search(self, params: dict) -> dict:
+        options = self._search_options(params)
+        candidates = self._candidates(params)
+        start = time.perf_counter()
+        if 'candidates' in params:
+            results = await self._run(candidates, options)
+            return {'results': {letters: [word for word, _ in matches] if self._ranked(matches) else sorted(matches)
+                                for letters, matches in results.items()},
+                    'seconds': time.perf_counter() - start}
+        letters = candidates[0]
+        key = (WordIndex.signature(letters), tuple(sorted(options.items())))
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._run([letters], options))
+            self._in_flight[key] = future
+            future.add_done_callback(lambda done: self._in_flight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # shielded, so a client that disconnects does not cancel the search other requests are waiting for
+        matches = next(iter((await asyncio.shield(future)).values()))
+        if self._ranked(matches):
+            return {'letters': letters, 'matches': [word for word, _ in matches],
+                    'scores': [score for _, score in matches], 'count': len(matches),
+                    'seconds': time.perf_counter() - start}
+        return {'letters': letters, 'matches': sorted(matches), 'count': len(matches),
+                'seconds': time.perf_counter() - start}
+
+    async def _run(self, candidates: list, options: dict) -> dict:
+        self.searches += 1
+        loop = asyncio.get_running_loop()
+        if 'top_k' in options:
+            return await loop.run_in_executor(
+                self._executor, lambda: {letters: self.core.top_matches(letters, **options) for letters in candidates})
+        return await loop.run_in_executor(self._executor, lambda: self.core.search_many(candidates, **options))
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: HTTPStatus, payload: dict, keep_alive: bool):
+        body = json.dumps(payload).encode('utf-8')
+        head = (f'HTTP/1.1 {status.value} {status.phrase}\r\n'
+                f'Content-Type: application/json\r\n'
+                f'Content-Length: {len(body)}\r\n'
+                f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n')
+        writer.write(head.encode('latin-1') + body)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    def stats(self) -> dict:
+        """
+        :return: Request, search and coalescing counters, latency percentiles over the last LATENCY_WINDOW requests,
+            the result cache stats and the size of the index.
+        """
+        latencies = sorted(self._latencies)
+
+        def percentile(fraction):
+            return latencies[max(int(-(-len(latencies) * fraction // 1)), 1) - 1] if latencies else None
+        return {'uptime_seconds': time.monotonic() - self._started if self._started else 0.0,
+                'requests': self.requests, 'errors': self.errors, 'searches': self.searches,
+                'coalesced': self.coalesced, 'in_flight': len(self._in_flight),
+                'latency_seconds': {'p50': percentile(0.50), 'p99': percentile(0.99),
+                                    'mean': sum(latencies) / len(latencies) if latencies else None,
+                                    'window': len(latencies)},
+                'result_cache': self.core.result_cache.stats if self.core.result_cache is not None else None,
+                'index_size': len(self.core.index)}
+
+
+@click.command(context_settings={'help_option_names': ['-h', '--help']})
+@click.option('--host', help='TCP host to listen on. Defaults to the config.')
+@click.option('--port', type=click.IntRange(min=0, max=65535), help='TCP port to listen on. Defaults to the config.')
+@click.option('--unix-socket', help='Listen on this Unix socket instead of TCP.')
+@backend_option
+@wordlist_option
+@config_option
+@click.option('--workers', '-w', type=click.IntRange(min=1), help='Search threads.')
+def main(host, port, unix_socket, backend, wordlist, config, workers):
+    """
+    Serve WordDescrambler searches from a warm index.
+    """
+    server_kwargs = {name: value for name, value in (('host', host), ('port', port), ('unix_socket', unix_socket),
+                                                     ('max_workers', workers))
+                     if value is not None}
+    server = DescramblerServer(WordDescramblerCore(**core_options(wordlist, config, backend)), **server_kwargs)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.core.close()
+
+
+if __name__ == '__main__':
+    main()
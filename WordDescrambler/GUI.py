@@ -1,6 +1,16 @@
-import tkinter as tk
 from logging import getLogger
-from tkinter import messagebox
+
+# tkinter is imported when the first window is created, so importing this module stays cheap for headless use
+tk = None
+messagebox = None
+ttk = None
+
+
+def _import_tkinter():
+    global tk, messagebox, ttk
+    if tk is None:
+        import tkinter as tk
+        from tkinter import messagebox, ttk
 
 class WordDescramblerGUI:
     """
@@ -16,6 +26,12 @@ class WordDescramblerGUI:
         - init_widgets(self): Initializes the required widgets for the GUI.
         - pack_widgets(self): Packs all initialized widgets into the main window.
         - pack_and_run(self): Packs all initialized widgets into the main window and starts the main event loop.
+        - open_results_window(self): Opens an empty results window that results can be appended to.
+        - append_results(self, lines, number_of_matches): Appends lines to the open results window.
+        - show_results_page(self, page): Shows one page of the results window.
+        - set_progress(self, done, total): Updates the progress bar. A total of 0 shows indeterminate progress.
+        - set_searching(self, searching): Switches the Submit and Cancel buttons between idle and searching.
+        - show_error(self, title, message): Shows an error dialog.
 
     Usage:
         To use the WordDescramblerGUI class, create an instance of it and call the pack_and_run() method.
@@ -27,8 +43,11 @@ class WordDescramblerGUI:
 
     Attributes:
         - TITLE_TEXT: A string representing the title text for the main window.
+        - RESULTS_PAGE_SIZE: The number of result lines shown per page. Only the page being viewed is kept in the
+          Text widget, so large result sets stay responsive.
     """
     TITLE_TEXT = "Word Descrambler"
+    RESULTS_PAGE_SIZE = 1000
 
     def __init__(self, **kwargs):
         self.logger = kwargs.get('logger', getLogger('dummy_logger'))
@@ -39,11 +58,17 @@ class WordDescramblerGUI:
         self._submit_button = None
         self._options_button = None
         self._quit_button = None
+        self._cancel_button = None
+        self._progress_bar = None
+        self.results_count_label = None
         self._initialized_widgets = None
         self._close_options_button = None
         self.options_window = None
         self.results_window = None
+        self._result_lines = []
+        self._results_page = 0
 
+        _import_tkinter()
         self.main_window = tk.Tk()
         self.main_window.title(self.TITLE_TEXT)
 
@@ -60,7 +85,29 @@ class WordDescramblerGUI:
             self.run_tool()
 
     def run_tool(self):
-        raise NotImplemented("this needs to be overwritten to function")
+        raise NotImplementedError("this needs to be overwritten to function")
+
+    def _cancel_pressed(self):
+        self.logger.debug('cancel button pressed')
+        self.cancel_tool()
+
+    def cancel_tool(self):
+        raise NotImplementedError("this needs to be overwritten to function")
+
+    def set_searching(self, searching: bool):
+        self._submit_button.config(state=tk.DISABLED if searching else tk.NORMAL)
+        self._cancel_button.config(state=tk.NORMAL if searching else tk.DISABLED)
+        if not searching:
+            self._progress_bar.stop()
+            self._progress_bar.config(mode='determinate', value=0)
+
+    def set_progress(self, done: int, total: int):
+        if total:
+            self._progress_bar.stop()
+            self._progress_bar.config(mode='determinate', maximum=total, value=done)
+        elif str(self._progress_bar.cget('mode')) != 'indeterminate':
+            self._progress_bar.config(mode='indeterminate')
+            self._progress_bar.start()
 
     def show_results(self, results_info, number_of_matches):
         self.results_window = tk.Tk('Results')
@@ -88,18 +135,80 @@ class WordDescramblerGUI:
                                               text='Close',
                                               command=self.options_window.destroy)
 
-    def init_results_widgets(self, results_info, number_of_matches:int):
-        self.results_info = tk.Text(self.results_window, name='results_info')#,text=results_info)
-        self.results_info.insert(tk.END, f"{number_of_matches:,} Results:\n")
-        self.results_info.insert(tk.END, results_info)
+    def init_results_widgets(self, results_info, number_of_matches: int):
+        """
+        :param results_info: The result lines, such as WordDescramblerCore.iter_match_lines(). They can be streamed;
+            a string is split into lines.
+        """
+        if isinstance(results_info, str):
+            results_info = (line.strip() for line in results_info.splitlines())
+        self._init_results_page_widgets()
+        self.append_results(results_info, number_of_matches)
+        self.logger.info('results window widgets initialized and packed')
+
+    def show_error(self, title: str, message: str):
+        messagebox.showerror(title, message)
+
+    def open_results_window(self):
+        if self.results_window is not None and self.results_window.winfo_exists():
+            self.results_window.destroy()
+        self.results_window = tk.Toplevel(self.main_window)
+        self.results_window.title('Results')
+        self._init_results_page_widgets()
+        self.logger.info('results window opened')
+
+    def _init_results_page_widgets(self):
+        self._result_lines = []
+        self._results_page = 0
+        self.results_count_label = tk.Label(self.results_window, name='results_count', text='0 Results:')
+        self.results_info = tk.Text(self.results_window, name='results_info')
+        self._results_nav_frame = tk.Frame(self.results_window, name='results_nav')
+        self._previous_page_button = tk.Button(master=self._results_nav_frame, name='previous_page_button',
+                                               text='< Previous', state=tk.DISABLED,
+                                               command=lambda: self.show_results_page(self._results_page - 1))
+        self._results_page_label = tk.Label(self._results_nav_frame, name='results_page', text='Page 1 of 1')
+        self._next_page_button = tk.Button(master=self._results_nav_frame, name='next_page_button',
+                                           text='Next >', state=tk.DISABLED,
+                                           command=lambda: self.show_results_page(self._results_page + 1))
+        for widget in self._results_nav_frame.winfo_children():
+            widget.pack(side=tk.LEFT)
         self.results_close_button = tk.Button(master=self.results_window,
                                               name='results_close_button',
                                               text='Close',
                                               command=self.results_window.destroy)
-        self.logger.info('results window widgets initialized')
         for widget in self.results_window.winfo_children():
             widget.pack()
-        self.logger.info('results window widgets packed')
+
+    @property
+    def results_page_count(self) -> int:
+        return max(-(-len(self._result_lines) // self.RESULTS_PAGE_SIZE), 1)
+
+    def show_results_page(self, page: int):
+        self._results_page = min(max(page, 0), self.results_page_count - 1)
+        start = self._results_page * self.RESULTS_PAGE_SIZE
+        self.results_info.delete('1.0', tk.END)
+        self.results_info.insert(tk.END, ''.join(f"\t{line}\n"
+                                                 for line in self._result_lines[start:start + self.RESULTS_PAGE_SIZE]))
+        self._update_results_nav()
+
+    def _update_results_nav(self):
+        page_count = self.results_page_count
+        self._results_page_label.config(text=f"Page {self._results_page + 1:,} of {page_count:,}")
+        self._previous_page_button.config(state=tk.NORMAL if self._results_page > 0 else tk.DISABLED)
+        self._next_page_button.config(state=tk.NORMAL if self._results_page < page_count - 1 else tk.DISABLED)
+
+    def append_results(self, lines, number_of_matches: int):
+        if self.results_window is None or not self.results_window.winfo_exists():
+            return
+        first_new = len(self._result_lines)
+        self._result_lines.extend(lines)
+        # only lines that land on the page being viewed go into the Text widget
+        page_end = (self._results_page + 1) * self.RESULTS_PAGE_SIZE
+        if first_new < page_end:
+            self.results_info.insert(tk.END, ''.join(f"\t{line}\n"
+                                                     for line in self._result_lines[first_new:page_end]))
+        self.results_count_label.config(text=f"{number_of_matches:,} Results:")
+        self._update_results_nav()
 
     def init_main_widgets(self):
         self._main_title_label = tk.Label(self.main_window, text=self.TITLE_TEXT,
@@ -117,6 +226,15 @@ class WordDescramblerGUI:
                                          text="Options",
                                          name="options_button",
                                          command=self.options_pressed)
+        self._cancel_button = tk.Button(master=self.main_window,
+                                        text="Cancel",
+                                        name="cancel_button",
+                                        state=tk.DISABLED,
+                                        command=self._cancel_pressed)
+        self._progress_bar = ttk.Progressbar(self.main_window,
+                                             name='progress_bar',
+                                             mode='determinate',
+                                             length=200)
         self._quit_button = tk.Button(master=self.main_window,
                                          text="Quit",
                                          name="quit_button",
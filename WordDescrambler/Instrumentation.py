@@ -0,0 +1,87 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class WorkerCounters:
+    """
+    The counters of one search worker. Only the worker that owns them writes to them, so they need no lock;
+    Instrumentation merges every worker's counters when they are read.
+
+    Attributes:
+        scanned (int): Index rows the worker checked, or trie nodes it visited with the trie backend.
+        prefilter_rejects (int): Rows rejected by the letter mask prefilter before their letter counts were compared.
+        matches (int): Matching words the worker found.
+    """
+    __slots__ = ('scanned', 'prefilter_rejects', 'matches')
+
+    def __init__(self):
+        self.scanned = 0
+        self.prefilter_rejects = 0
+        self.matches = 0
+
+    def as_dict(self) -> dict:
+        return {'scanned': self.scanned, 'prefilter_rejects': self.prefilter_rejects, 'matches': self.matches}
+
+
+class Instrumentation:
+    """
+    Phase timings and per-worker counters for WordDescramblerCore, cheap enough to leave on.
+
+    Phases are timed with the monotonic time.perf_counter, and a phase that runs again replaces its previous timing.
+    Phases can nest: the first search also loads the wordlist and builds the index, so 'search' includes
+    'wordlist_load' and 'index_build' that time.
+
+    Each worker asks for its own WorkerCounters at start-up and updates only those, so counting costs a local
+    increment and never contends for a lock. The lock is only taken to register a worker.
+
+    Attributes:
+        PHASES (tuple): The phases WordDescramblerCore times, in the order they usually run.
+        timings (dict): The duration in seconds of the last run of each phase.
+
+    Methods:
+        phase(name): A context manager that times one phase.
+        worker_counters(): Register and return the counters for a new worker.
+        reset_counters(): Forget the workers of the previous search.
+        counters: The counters of every worker added together.
+        as_dict(): The timings and counters, ready to be written as JSON.
+    """
+    PHASES = ('config_load', 'wordlist_load', 'index_build', 'search', 'output_formatting')
+
+    def __init__(self):
+        self.timings = {}
+        self._workers = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = time.perf_counter() - start
+
+    def worker_counters(self) -> WorkerCounters:
+        counters = WorkerCounters()
+        with self._lock:
+            self._workers.append(counters)
+        return counters
+
+    def reset_counters(self):
+        with self._lock:
+            self._workers = []
+
+    @property
+    def counters(self) -> dict:
+        """
+        :return: The scanned, prefilter_rejects and matches counters summed over every worker.
+        """
+        merged = WorkerCounters()
+        for worker in self._workers:
+            merged.scanned += worker.scanned
+            merged.prefilter_rejects += worker.prefilter_rejects
+            merged.matches += worker.matches
+        return merged.as_dict()
+
+    def as_dict(self) -> dict:
+        return {'timings_seconds': dict(self.timings), 'counters': self.counters, 'workers': len(self._workers)}
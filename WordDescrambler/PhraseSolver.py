@@ -0,0 +1,182 @@
+from collections import defaultdict
+from itertools import chain, combinations_with_replacement, groupby, product
+from logging import getLogger
+from operator import sub
+
+from WordIndex import WordIndex
+
+
+class PhraseSolver:
+    """
+    Finds the phrases that use every candidate letter exactly once, such as 'ice man' for 'cinema', by decomposing
+    the candidate letters into a sequence of dictionary words.
+
+    The search runs over word signatures instead of words. Every anagram of a word has the same letter counts, so
+    one branch covers them all, and a phrase is only expanded into its words when it is yielded. Signatures are
+    kept in one fixed order, longest first, and a phrase only ever picks them in that order, so each phrase is found
+    once instead of once per permutation ('ice man' but never 'man ice').
+
+    A search state is the letters still to be used, the first signature the next word may come from and the number
+    of words left. The completions of each state are memoized, so a remainder that many different first words lead
+    to is only solved once, and a state without any is remembered as a dead end. States are pruned before they are
+    searched when the remaining words cannot hold the remaining letters, or when a remaining letter appears in none
+    of the signatures that still fit.
+
+    Attributes:
+        MEMO_LIMIT (int): States with more completions than this are not memoized, so the memo stays small when a
+            search has a huge number of phrases.
+        letter_counts (tuple): The letter-count vector of the candidate letters.
+        length (int): The number of candidate letters.
+        max_words (int): The most words a phrase may have.
+        min_word_length (int): The shortest word a phrase may use.
+        signatures (list of tuple): The letter-count vector of each word signature that fits the candidate letters,
+            longest first.
+        words (list of list): The words of each signature, sorted.
+        states (int): The states the last search expanded.
+        memo_hits (int): The states the last search found in the memo.
+
+    Methods:
+        iter_phrases(max_results): Yield the phrases as tuples of words, as they are found.
+    """
+    MEMO_LIMIT = 10000
+
+    def __init__(self, letters: str, words, max_words: int = None, min_word_length: int = 1, **kwargs):
+        """
+        :param letters: The candidate letters. Characters outside WordIndex.ALPHABET are ignored.
+        :param words: The words phrases may use, such as the sub-anagrams of the letters. Words that do not fit
+            the letters or are shorter than min_word_length are skipped.
+        :param max_words: The most words a phrase may have, or None for no limit.
+        :param min_word_length: The shortest word a phrase may use.
+        """
+        self.logger = kwargs.get('logger', getLogger('dummy_logger'))
+        self.letter_counts = tuple(WordIndex.letter_counts(letters))
+        self.length = sum(self.letter_counts)
+        self.min_word_length = max(min_word_length, 1)
+        self.max_words = max_words or self.length // self.min_word_length
+
+        by_signature = defaultdict(list)
+        for word in words:
+            counts = tuple(WordIndex.letter_counts(word))
+            if (len(word) >= self.min_word_length and sum(counts) == len(word)
+                    and all(map(int.__le__, counts, self.letter_counts))):
+                by_signature[counts].append(word)
+        order = sorted(by_signature, key=lambda counts: (-sum(counts), min(by_signature[counts])))
+        self.signatures = order
+        self.words = [sorted(by_signature[counts]) for counts in order]
+        self._positions = {counts: position for position, counts in enumerate(order)}
+        self._lengths = [sum(counts) for counts in order]
+        self._masks = [self._mask(counts) for counts in order]
+        self._letters = [tuple((slot, count) for slot, count in enumerate(counts) if count) for counts in order]
+        self._memo = {}
+        self.states = 0
+        self.memo_hits = 0
+
+    @staticmethod
+    def _mask(counts) -> int:
+        mask = 0
+        for slot, count in enumerate(counts):
+            if count:
+                mask |= 1 << slot
+        return mask
+
+    def _fitting(self, positions, counts, mask: int) -> list:
+        """
+        :return: The signature positions among `positions` that can be built from the letter counts.
+        """
+        reject_mask = ~mask
+        masks, letters = self._masks, self._letters
+        return [position for position in positions if not masks[position] & reject_mask
+                and all(counts[slot] >= count for slot, count in letters[position])]
+
+    def iter_phrases(self, max_results: int = None):
+        """
+        :param max_results: Stop after this many phrases. None finds them all.
+        :return: Generator of phrases, each a tuple of words, longest first. Phrases stream out as they are found,
+            so the first ones arrive long before a large search is done.
+        """
+        self._memo = {}
+        self.states = self.memo_hits = 0
+        found = 0
+        try:
+            if not self.length:
+                return
+            candidates = list(range(len(self.signatures)))
+            for positions in self._completions(self.letter_counts, self.length, candidates, self.max_words):
+                for phrase in self._expand(positions):
+                    yield phrase
+                    found += 1
+                    if max_results and found >= max_results:
+                        return
+        finally:
+            self.logger.info(f'{found:,} phrases found from {len(self.signatures):,} word signatures, '
+                             f'{self.states:,} states expanded, {self.memo_hits:,} memo hits.')
+
+    def _completions(self, remaining: tuple, remaining_length: int, candidates: list, words_left: int):
+        """
+        :param remaining: The letter counts still to be used.
+        :param remaining_length: The number of letters still to be used.
+        :param candidates: The signature positions the next word may come from: those from the previous word's
+            position on that fit the remaining letters, in order.
+        :param words_left: How many more words the phrase may have.
+        :return: Generator of tuples of signature positions that use exactly the remaining letters.
+        """
+        if not remaining_length:
+            yield ()
+            return
+        if not words_left or not candidates:
+            return
+        min_word_length = self.min_word_length
+        if words_left == 1 or remaining_length < 2 * min_word_length:
+            # whatever is left has to be a single word
+            position = self._positions.get(remaining)
+            if position is not None and position >= candidates[0]:
+                yield position,
+            return
+
+        key = (remaining, candidates[0], words_left)
+        memoized = self._memo.get(key)
+        if memoized is not None:
+            self.memo_hits += 1
+            yield from memoized
+            return
+        self.states += 1
+
+        covered = 0
+        for position in candidates:
+            covered |= self._masks[position]
+        if self._mask(remaining) & ~covered:
+            # a remaining letter is in none of the words that still fit
+            self._memo[key] = ()
+            return
+
+        lengths, signatures = self._lengths, self.signatures
+        completions = []
+        for offset, position in enumerate(candidates):
+            length = lengths[position]
+            if length * words_left < remaining_length:
+                # the words after this one are no longer, so they cannot hold the remaining letters either
+                break
+            rest_length = remaining_length - length
+            if 0 < rest_length < min_word_length:
+                continue
+            rest = tuple(map(sub, remaining, signatures[position]))
+            rest_candidates = self._fitting(candidates[offset:], rest, self._mask(rest))
+            for completion in self._completions(rest, rest_length, rest_candidates, words_left - 1):
+                phrase = (position,) + completion
+                if completions is not None:
+                    completions.append(phrase)
+                    if len(completions) > self.MEMO_LIMIT:
+                        completions = None
+                yield phrase
+        if completions is not None:
+            self._memo[key] = completions
+
+    def _expand(self, positions: tuple):
+        """
+        :return: Generator of the word tuples of a phrase of signatures. A signature used more than once
+            gets each combination of its words once.
+        """
+        groups = [combinations_with_replacement(self.words[position], len(list(run)))
+                  for position, run in groupby(positions)]
+        for choice in product(*groups):
+            yield tuple(chain.from_iterable(choice))
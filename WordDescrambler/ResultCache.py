@@ -0,0 +1,175 @@
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from logging import getLogger
+from pathlib import Path
+
+
+class ResultCache:
+    """
+    A bounded, thread-safe cache of search results with least-recently-used eviction.
+
+    Keys are built by `make_key` from the canonical letter multiset of the candidates plus every option that
+    changes the result, so permutations of the same letters ('listen' and 'silent') share one entry.
+    An optional on-disk tier, stored in SQLite, survives restarts. Entries found on disk are promoted
+    into memory.
+
+    The disk tier can be shared by several processes, such as the CLI, the server and the GUI pointed at the same
+    result_cache_path. The database is in WAL mode, so readers do not block the writer, and a writer waits up to
+    BUSY_TIMEOUT seconds for another one. A process forked from the one that opened the database opens its own
+    connection, since SQLite connections must not be used across a fork. Errors of the disk tier are logged and
+    treated as misses, so they never fail a search.
+
+    Attributes:
+        BUSY_TIMEOUT (float): Seconds a disk write waits for another process's write to finish.
+        max_size (int): The most entries kept in memory. 0 disables the in-memory tier.
+        disk_path (Path or None): The SQLite database of the on-disk tier, or None if there is no disk tier.
+        hits (int): Lookups answered from memory.
+        disk_hits (int): Lookups answered from disk.
+        misses (int): Lookups that found nothing.
+
+    Methods:
+        make_key(signature, use_all_letters, min_match_length, limit_length, wordlist_identity): Build a cache key.
+        get(key): Return the cached matches for a key, or None.
+        put(key, matches): Store the matches for a key.
+        invalidate(): Drop the entries held in memory.
+        close(): Close the on-disk tier.
+        stats: The hit and miss counters, for monitoring.
+    """
+    BUSY_TIMEOUT = 5.0
+
+    def __init__(self, max_size: int = 1024, disk_path: Path or str = None, **kwargs):
+        self.logger = kwargs.get('logger', getLogger('dummy_logger'))
+        self.max_size = max_size
+        self.disk_path = Path(disk_path) if disk_path else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = None
+        self._connection_pid = None
+        # connections inherited through a fork, kept referenced so they are never closed in the child
+        self._forked_connections = []
+        if self.disk_path is not None:
+            self.disk_path.parent.mkdir(parents=True, exist_ok=True)
+            self._connect()
+            self.logger.info(f'result cache disk tier opened at {self.disk_path}')
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        :return: The connection to the disk tier of this process, opened on first use.
+        """
+        if self._connection is not None and self._connection_pid == os.getpid():
+            return self._connection
+        if self._connection is not None:
+            self._forked_connections.append(self._connection)
+        try:
+            connection = self._open_database()
+        except sqlite3.DatabaseError:
+            # most likely the shelve file an older version kept at the same path; it only held cached results
+            self.logger.warning(f'{self.disk_path} is not a result cache database, replacing it.')
+            self.disk_path.unlink()
+            connection = self._open_database()
+        self._connection, self._connection_pid = connection, os.getpid()
+        return connection
+
+    def _open_database(self) -> sqlite3.Connection:
+        # autocommit, so every write is its own short transaction and holds the write lock as briefly as possible
+        connection = sqlite3.connect(str(self.disk_path), timeout=self.BUSY_TIMEOUT, isolation_level=None,
+                                     check_same_thread=False)
+        try:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, matches TEXT NOT NULL)')
+        except sqlite3.DatabaseError:
+            connection.close()
+            raise
+        return connection
+
+    @staticmethod
+    def make_key(signature: str, use_all_letters: bool, min_match_length: int, limit_length: int or None,
+                 wordlist_identity: str) -> str:
+        """
+        :param signature: The canonical letter multiset of the candidates (see WordIndex.signature).
+        :return: A string key covering the candidates and every option that changes the result.
+        """
+        return json.dumps([signature, bool(use_all_letters), min_match_length, limit_length or None,
+                           wordlist_identity])
+
+    def get(self, key: str) -> frozenset or None:
+        """
+        :return: The cached matches for the key, or None on a miss.
+        """
+        with self._lock:
+            matches = self._entries.get(key)
+            if matches is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return matches
+            if self.disk_path is not None:
+                try:
+                    row = self._connect().execute('SELECT matches FROM results WHERE key = ?', (key,)).fetchone()
+                except sqlite3.Error as e:
+                    self.logger.warning(f'result cache disk tier read failed: {e}')
+                    row = None
+                if row is not None:
+                    matches = frozenset(json.loads(row[0]))
+                    self._store(key, matches)
+                    self.disk_hits += 1
+                    return matches
+            self.misses += 1
+            return None
+
+    def put(self, key: str, matches):
+        """
+        Store the matches for a key in memory, evicting the least recently used entry when full,
+        and on disk if there is a disk tier.
+
+        :return: None
+        """
+        matches = frozenset(matches)
+        with self._lock:
+            self._store(key, matches)
+            if self.disk_path is not None:
+                try:
+                    self._connect().execute('INSERT OR REPLACE INTO results (key, matches) VALUES (?, ?)',
+                                            (key, json.dumps(sorted(matches))))
+                except sqlite3.Error as e:
+                    self.logger.warning(f'result cache disk tier write failed: {e}')
+
+    def _store(self, key: str, matches: frozenset):
+        if self.max_size <= 0:
+            return
+        self._entries[key] = matches
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self):
+        """
+        Drop the entries held in memory. The counters are kept.
+
+        The disk tier is left alone: it is shared with other wordlists and other processes, and its keys include the
+        wordlist identity, so the entries of a wordlist that changed are never hit again anyway.
+
+        :return: None
+        """
+        with self._lock:
+            self._entries.clear()
+        self.logger.info('result cache invalidated.')
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None and self._connection_pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+            self.disk_path = None
+
+    @property
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {'size': len(self._entries), 'max_size': self.max_size,
+                'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses,
+                'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0}
@@ -157,6 +157,8 @@ class Runtime:
         save_file_path = Path(kwargs.get('save_file_path', './Misc_Project_Files/last_runtime.txt'))
         as_text = kwargs.get('as_text', False)
         as_json = kwargs.get('as_json', False)
+        # extra keys for the JSON output, for example the instrumentation of the last search
+        extra = kwargs.get('extra', {})
 
         if as_text and as_json:
             raise ValueError("both as_text and as_json cannot be True.")
@@ -173,7 +175,8 @@ class Runtime:
                 with open(save_file_path, 'w') as f:
                     import json
                     json.dump({'program_start_time': self.pretty_start_time,
-                               'program_runtime': self.runtime},
+                               'program_runtime': self.runtime,
+                               **extra},
                               f, indent=4)
                 print(f"runtime output to {save_file_path.resolve()}")
             except FileNotFoundError as e:
@@ -0,0 +1,127 @@
+from logging import getLogger
+from pathlib import Path
+
+
+class Scorer:
+    """
+    Scores matching words for ranked searches (see WordDescramblerCore.top_matches). Higher scores rank first.
+
+    A scorer only has to implement `score`. A scorer that can also bound the best score any word of a given length
+    could reach implements `max_score`, which lets a ranked search skip whole length buckets once its top k is full
+    of better words.
+
+    Attributes:
+        NAME (str): The name used to select the scorer in the config.
+
+    Methods:
+        score(word, blank_letters): Return the score of a matching word.
+        max_score(length, candidate_letters): Return an upper bound of the score of any word of that length
+            built from the candidate letters, or None if there is no useful bound.
+    """
+    NAME = None
+
+    def score(self, word: str, blank_letters: str = '') -> float:
+        """
+        :param word: The matching word.
+        :param blank_letters: The letters of the word that wildcards stand for.
+        :return: The score of the word.
+        """
+        raise NotImplementedError
+
+    def max_score(self, length: int, candidate_letters: str) -> float or None:
+        return None
+
+
+class LengthScorer(Scorer):
+    """
+    Ranks longer words first.
+    """
+    NAME = 'length'
+
+    def score(self, word: str, blank_letters: str = '') -> float:
+        return len(word)
+
+    def max_score(self, length: int, candidate_letters: str) -> float:
+        return length
+
+
+class TileScorer(Scorer):
+    """
+    Ranks words by the sum of their tile values, as in Scrabble. Letters that wildcards stand for score nothing,
+    like blank tiles.
+
+    Attributes:
+        TILE_VALUES (dict): The English Scrabble tile values, used unless others are given.
+        tile_values (dict): The value of each letter. Letters without one score 0.
+    """
+    NAME = 'tiles'
+    TILE_VALUES = {**dict.fromkeys('aeilnorstu', 1), **dict.fromkeys('dg', 2), **dict.fromkeys('bcmp', 3),
+                   **dict.fromkeys('fhvwy', 4), 'k': 5, **dict.fromkeys('jx', 8), **dict.fromkeys('qz', 10)}
+
+    def __init__(self, tile_values: dict = None):
+        self.tile_values = tile_values or self.TILE_VALUES
+
+    def score(self, word: str, blank_letters: str = '') -> float:
+        tile_values = self.tile_values
+        return sum(tile_values.get(letter, 0) for letter in word) - sum(tile_values.get(letter, 0)
+                                                                        for letter in blank_letters)
+
+    def max_score(self, length: int, candidate_letters: str) -> float:
+        """
+        :return: The sum of the `length` most valuable candidate letters. Wildcards are worth 0.
+        """
+        values = sorted((self.tile_values.get(letter, 0) for letter in candidate_letters.lower()), reverse=True)
+        return sum(values[:length])
+
+
+class FrequencyScorer(Scorer):
+    """
+    Ranks common words first, by their count in a corpus. Words without a count score 0.
+
+    Attributes:
+        frequencies (dict): The count of each word.
+
+    Methods:
+        from_file(path): Read the counts from a file of 'word count' lines.
+    """
+    NAME = 'frequency'
+
+    def __init__(self, frequencies: dict):
+        self.frequencies = frequencies
+        # the best count of each word length, the bound for its length bucket
+        self._best_by_length = {}
+        for word, count in frequencies.items():
+            if count > self._best_by_length.get(len(word), 0):
+                self._best_by_length[len(word)] = count
+
+    @classmethod
+    def from_file(cls, path: Path or str, **kwargs):
+        """
+        :param path: A text file with one word and its count per line, separated by whitespace.
+            Lines that do not parse are skipped.
+        :return: A FrequencyScorer with the counts of the file.
+        """
+        logger = kwargs.get('logger', getLogger('dummy_logger'))
+        frequencies = {}
+        with Path(path).open('r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) != 2:
+                    continue
+                try:
+                    count = float(fields[1])
+                except ValueError:
+                    continue
+                word = fields[0].lower()
+                frequencies[word] = frequencies.get(word, 0) + count
+        logger.info(f'{len(frequencies):,} word frequencies read from {path}.')
+        return cls(frequencies)
+
+    def score(self, word: str, blank_letters: str = '') -> float:
+        return self.frequencies.get(word, 0)
+
+    def max_score(self, length: int, candidate_letters: str) -> float:
+        return self._best_by_length.get(length, 0)
+
+
+SCORERS = {scorer.NAME: scorer for scorer in (LengthScorer, TileScorer, FrequencyScorer)}
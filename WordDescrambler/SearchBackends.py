@@ -0,0 +1,215 @@
+from array import array
+from importlib.util import find_spec
+from logging import getLogger
+from operator import le
+from os import cpu_count
+from weakref import finalize
+
+# numpy is optional and slow to import, so it is only imported when a NumpySearchBackend is built
+np = None
+
+
+class NumpySearchBackend:
+    """
+    A vectorized search backend that checks the whole wordlist at once, with no per-word Python loop.
+
+    The index is copied once into an (N words x 26) uint8 letter-count matrix whose rows are in the index's
+    length_order, so the words of each length are one contiguous block. A query only slices the blocks between its
+    length bounds and reduces them with a single broadcast `counts <= candidate_counts`.
+
+    Attributes:
+        NAME (str): The name used to select this backend.
+        index (WordIndex): The index the matrix was built from.
+        order (numpy.ndarray): index.length_order: the index row of each matrix row.
+        counts (numpy.ndarray): The (N x 26) letter-count matrix, in length order.
+        valid (numpy.ndarray): False for words containing characters outside WordIndex.ALPHABET, in length order.
+
+    Methods:
+        is_available(): Return True if NumPy can be imported.
+        search(candidate_counts, min_length, max_length): Return the words that can be built from the candidates.
+        search_rows(candidate_counts, min_length, max_length): Like search, but return index rows.
+    """
+    NAME = 'numpy'
+
+    def __init__(self, index, **kwargs):
+        if not self.is_available():
+            raise ImportError(f'{self.__class__.__name__} requires numpy.')
+        global np
+        import numpy as np
+        self.logger = kwargs.get('logger', getLogger('dummy_logger'))
+        self.index = index
+        alphabet_size = len(index.ALPHABET)
+        self.order = np.frombuffer(index.length_order, dtype=np.uint32)
+        self.counts = np.frombuffer(index.counts.buffer, dtype=np.uint8).reshape(-1, alphabet_size)[self.order]
+        self.valid = (np.frombuffer(index.masks, dtype=np.uint32)[self.order] & index.OTHER_BIT) == 0
+        self.logger.info(f'{self.__class__.__name__} built a {self.counts.shape[0]:,} x {alphabet_size} count matrix.')
+
+    @staticmethod
+    def is_available() -> bool:
+        return np is not None or find_spec('numpy') is not None
+
+    def search(self, candidate_counts, min_length: int, max_length: int = None,
+               start_index: int = 0, end_index: int = None, blanks: int = 0) -> list:
+        """
+        :param candidate_counts: The letter-count vector of the candidate letters, without wildcards.
+        :param min_length: The shortest word length to return.
+        :param max_length: The longest word length to return, or None for no limit.
+        :param start_index: The first position in index.length_order to check.
+        :param end_index: One past the last position in index.length_order to check. Defaults to the end.
+        :param blanks: The number of wildcards, which may cover that many letters missing from the candidates.
+        :return: The words that can be built from the candidate letters, in length order.
+        """
+        words = self.index.words
+        return [words[row] for row in self.search_rows(candidate_counts, min_length, max_length,
+                                                       start_index, end_index, blanks)]
+
+    def search_rows(self, candidate_counts, min_length: int, max_length: int = None,
+                    start_index: int = 0, end_index: int = None, blanks: int = 0) -> list:
+        """
+        Like search, but return the index rows of the matching words.
+        """
+        bucket_start, bucket_end = self.index.length_range(min_length, max_length)
+        start_index = max(start_index, bucket_start)
+        end_index = bucket_end if end_index is None else max(min(end_index, bucket_end), start_index)
+        rows = slice(start_index, end_index)
+        candidates = np.minimum(np.asarray(candidate_counts), 255).astype(np.uint8)
+        if blanks:
+            deficit = np.maximum(self.counts[rows].astype(np.int16) - candidates, 0).sum(axis=1)
+            selected = deficit <= blanks
+        else:
+            selected = (self.counts[rows] <= candidates).all(axis=1)
+        selected &= self.valid[rows]
+        return self.order[rows][selected].tolist()
+
+
+def _attach_shared_index(shm_name: str, size: int):
+    """
+    Attach to the shared index block in a worker process, once per process.
+
+    :param shm_name: The name of the SharedMemory block holding the index columns.
+    :param size: The number of words in the index.
+    :return: The masks, length_order and counts views of the block.
+    """
+    views = _WORKER_VIEWS.get(shm_name)
+    if views is None:
+        from multiprocessing import shared_memory
+        # pool workers share the parent's resource tracker, so attaching here does not take ownership of the block
+        shm = shared_memory.SharedMemory(name=shm_name)
+        buffer = shm.buf
+        masks_end = size * 4
+        order_end = masks_end + size * 4
+        views = (shm,
+                 buffer[:masks_end].cast('I'),
+                 buffer[masks_end:order_end].cast('I'),
+                 buffer[order_end:order_end + size * ProcessPoolSearchBackend.ALPHABET_SIZE])
+        _WORKER_VIEWS[shm_name] = views
+    return views[1:]
+
+
+def _scan_shared_range(shm_name: str, size: int, start_index: int, end_index: int,
+                       candidate_counts, candidate_mask: int) -> list:
+    """
+    Scan a span of the shared length_order for words that can be built from the candidate letters.
+    The parent only sends spans inside the length buckets it wants, so lengths are not checked here.
+
+    :return: The matching row numbers.
+    """
+    masks, length_order, counts = _attach_shared_index(shm_name, size)
+    width = ProcessPoolSearchBackend.ALPHABET_SIZE
+    reject_mask = ~candidate_mask
+    rows = []
+    for row in length_order[start_index:end_index]:
+        if masks[row] & reject_mask:
+            continue
+        offset = row * width
+        if all(map(le, counts[offset:offset + width], candidate_counts)):
+            rows.append(row)
+    return rows
+
+
+_WORKER_VIEWS = {}
+
+
+class ProcessPoolSearchBackend:
+    """
+    A search backend that scans the wordlist in a pool of worker processes, so the scan is not serialized by the GIL.
+
+    The index columns (masks, length_order and letter counts) are copied once into a `multiprocessing.shared_memory`
+    block. Workers attach to it by name and receive spans of length_order, limited to the length buckets a query
+    wants, instead of copies of the wordlist. Each worker returns the
+    matching row numbers, which are merged in the parent in one step.
+
+    Attributes:
+        NAME (str): The name used to select this backend.
+        ALPHABET_SIZE (int): The width of a letter-count row.
+        CHUNKS_PER_WORKER (int): How many row ranges each worker receives per search, to even out the load.
+        index (WordIndex): The index the shared block was built from.
+        num_processes (int): The number of worker processes.
+
+    Methods:
+        search(candidate_counts, candidate_mask, min_length, max_length): Return the words that can be built from
+            the candidates.
+        close(): Shut down the worker pool and release the shared block.
+    """
+    NAME = 'process'
+    ALPHABET_SIZE = 26
+    CHUNKS_PER_WORKER = 4
+
+    def __init__(self, index, num_processes: int = None, **kwargs):
+        from multiprocessing import shared_memory
+        self.logger = kwargs.get('logger', getLogger('dummy_logger'))
+        self.index = index
+        self.num_processes = num_processes or cpu_count() or 1
+        size = len(index)
+        masks_end = size * 4
+        order_end = masks_end + size * 4
+        self._shm = shared_memory.SharedMemory(create=True, size=max(order_end + size * self.ALPHABET_SIZE, 1))
+        self._shm.buf[:masks_end] = array('I', index.masks).tobytes()
+        self._shm.buf[masks_end:order_end] = array('I', index.length_order).tobytes()
+        self._shm.buf[order_end:order_end + size * self.ALPHABET_SIZE] = index.counts.buffer
+        self._pool = None
+        self._finalizer = finalize(self, self._release, self._shm, None)
+        self.logger.info(f'{self.__class__.__name__} shared {size:,} words in {self._shm.name}.')
+
+    @staticmethod
+    def _release(shm, pool):
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        shm.close()
+        shm.unlink()
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+            self._pool = ProcessPoolExecutor(max_workers=self.num_processes)
+            self._finalizer.detach()
+            self._finalizer = finalize(self, self._release, self._shm, self._pool)
+            self.logger.info(f'process pool started with {self.num_processes} workers.')
+        return self._pool
+
+    def search(self, candidate_counts, candidate_mask: int, min_length: int, max_length: int = None) -> list:
+        """
+        :param candidate_counts: The letter-count vector of the candidate letters.
+        :param candidate_mask: The letter presence mask of the candidate letters.
+        :param min_length: The shortest word length to return.
+        :param max_length: The longest word length to return, or None for no limit.
+        :return: The words that can be built from the candidate letters, in length order.
+        """
+        size = len(self.index)
+        bucket_start, bucket_end = self.index.length_range(min_length, max_length)
+        num_chunks = self.num_processes * self.CHUNKS_PER_WORKER
+        chunk_size = max(-(-(bucket_end - bucket_start) // num_chunks), 1)
+        futures = [self.pool.submit(_scan_shared_range, self._shm.name, size, start_index,
+                                    min(start_index + chunk_size, bucket_end), list(candidate_counts), candidate_mask)
+                   for start_index in range(bucket_start, bucket_end, chunk_size)]
+        words = self.index.words
+        return [words[row] for future in futures for row in future.result()]
+
+    def close(self):
+        """
+        Shut down the worker pool and release the shared block. The backend cannot be used afterwards.
+
+        :return: None
+        """
+        self._finalizer()
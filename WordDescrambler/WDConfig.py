@@ -21,13 +21,31 @@ class WordDescramblerConfig(BetterConfigAJM):
             'WORDLIST': {
                 'path_to_wordlist': '',
                 'use_basic_wordlist': False,
-
+                'cache_dir': '',
+                'watch_interval': 0,
+                'share_wordlists': True
             },
             'SEARCH': {
                 'print_matches': True,
                 'use_columns': True,
                 'words_per_column': 0,
-                'column_number': 3
+                'column_number': 3,
+                'search_backend': 'auto',
+                'result_cache_size': 1024,
+                'result_cache_path': '',
+                'top_k': 0,
+                'scorer': 'length',
+                'frequency_path': '',
+                'pattern': ''
+            },
+            'PHRASES': {
+                'max_words': 3,
+                'min_word_length': 3
+            },
+            'SERVER': {
+                'host': '127.0.0.1',
+                'port': 8765,
+                'unix_socket': ''
             }
         }]
         super().__init__(*args, **kwargs)
@@ -38,3 +56,10 @@ class WordDescramblerConfig(BetterConfigAJM):
             self.config_list_dict = self.default_config
         # making this resolve to an absolute path
         self.config_location = Path(self.config_location).resolve()
+
+    def GetConfig(self):
+        # a config file written by an older version lacks the options added since, and GetConfig only reads
+        # what is on disk, so seed the parser with the defaults first and let the file override them
+        for sections in self.config_list_dict:
+            self.read_dict(sections)
+        return super().GetConfig()
@@ -1,30 +1,107 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 from WordDescramblerCore import WordDescramblerCore
 from GUI import WordDescramblerGUI
-from WDLogger import WDLogger
 
 
 class WordDescrambler(WordDescramblerGUI, WordDescramblerCore):
+    """
+    The Word Descrambler app: the Tk GUI on top of WordDescramblerCore.
+
+    Searches run on a background thread through iter_matches, so the main window stays responsive.
+    The Tk loop polls for new matches every POLL_MILLISECONDS with after(), appends them to the results
+    window, and updates the progress bar from stream_progress. Cancel sets the search's cancel event,
+    which stops the scanning workers.
+
+    Attributes:
+        POLL_MILLISECONDS (int): How often the Tk loop checks the background search.
+        MAX_RESULTS_PER_POLL (int): The most matches added to the results window per poll, so the GUI
+            keeps handling events while a large result set streams in.
+    """
+    POLL_MILLISECONDS = 100
+    MAX_RESULTS_PER_POLL = 2000
+
     def __init__(self, **kwargs):
-        self.logger = kwargs.get('logger',
-                                 WDLogger().UseLogger(root_log_location='./logs',
-                                                      project_name=self.__class__.__name__).logger)
+        self.logger = kwargs.get('logger') or self._default_logger()
         self.DEFAULT_CONFIG_PATH = './cfg/config.ini'
         self.logger.debug(F"DEFAULT_CONFIG_PATH set to : {self.DEFAULT_CONFIG_PATH}")
         WordDescramblerGUI.__init__(self, logger=self.logger)
         self.logger.info("WordDescramblerGUI initialized")
         WordDescramblerCore.__init__(self, candidate_letters=None, logger=self.logger)
         self.logger.info("WordDescramblerCore initialized")
+        self._search_executor = None
+        self._search_future = None
+        self._cancel_event = None
+        self._found_queue = None
         # TODO: add GUI options support
         # TODO: add except_hook logic to __init__
 
+    def _default_logger(self):
+        from WDLogger import WDLogger
+        return WDLogger().UseLogger(root_log_location='./logs', project_name=self.__class__.__name__).logger
+
+    @property
+    def search_executor(self) -> ThreadPoolExecutor:
+        if self._search_executor is None:
+            self._search_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='search')
+        return self._search_executor
+
     def run_tool(self):
+        if self._search_future is not None and not self._search_future.done():
+            self.logger.warning('a search is already running.')
+            return
         self.candidate_letters = self._candidate_letters_value.get()
         self.logger.info(f'candidate letters submitted: {self.candidate_letters}')
-        self.search()
 
-        match_string = self.print_matches()
+        self.match_list = set()
+        self._cancel_event = threading.Event()
+        self._found_queue = queue.Queue()
+        self.open_results_window()
+        self.set_searching(True)
+        self._search_future = self.search_executor.submit(self._background_search)
+        self.main_window.after(self.POLL_MILLISECONDS, self._poll_search)
+
+    def cancel_tool(self):
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+            self.logger.info('search cancelled.')
+
+    def _background_search(self):
+        for word in self.iter_matches(cancel_event=self._cancel_event):
+            self._found_queue.put(word)
+
+    def _poll_search(self):
+        new_matches = []
+        while len(new_matches) < self.MAX_RESULTS_PER_POLL:
+            try:
+                new_matches.append(self._found_queue.get_nowait())
+            except queue.Empty:
+                break
+        if new_matches:
+            self.match_list.update(new_matches)
+            self.append_results(new_matches, len(self.match_list))
+        self.set_progress(*self.stream_progress)
+
+        if self._search_future.done() and self._found_queue.empty():
+            self.set_searching(False)
+            error = self._search_future.exception()
+            if error is not None:
+                self.logger.error(f'search failed: {error}')
+                self.show_error('Search failed', str(error))
+            else:
+                self.logger.info(f"{len(self.match_list):,} matches found.")
+        else:
+            self.main_window.after(self.POLL_MILLISECONDS, self._poll_search)
 
-        self.show_results(match_string, len(self.match_list))
+    def pack_and_run(self):
+        try:
+            super().pack_and_run()
+        finally:
+            self.cancel_tool()
+            if self._search_executor is not None:
+                self._search_executor.shutdown(wait=False, cancel_futures=True)
 
 
 if __name__ == '__main__':
@@ -1,14 +1,31 @@
 # given a list of letters, find any words that can be made with them (use wordlist) - perfect for multithreading
 from logging import getLogger
 import threading
+from array import array
+import json
+import queue
+import sys
 import time
+from hashlib import sha1
+from heapq import heappush, heapreplace, nlargest
+from itertools import chain, islice
+from operator import le
 from os import system
 from typing import Optional
 
 from Runtime import Runtime
 from pathlib import Path
-from nltk.corpus import words
 from WDConfig import WordDescramblerConfig
+from WordIndex import WordIndex, WordlistView, PositionalIndex
+from WordlistReader import WordlistReader
+from WordlistWatcher import WordlistWatcher
+from WordlistCache import WordlistCache
+from WordlistRegistry import WordlistRegistry
+from ResultCache import ResultCache
+from Instrumentation import Instrumentation
+from Scoring import Scorer, FrequencyScorer, SCORERS
+from PhraseSolver import PhraseSolver
+from SearchBackends import NumpySearchBackend, ProcessPoolSearchBackend
 
 def sleep_timer(total_sleep_seconds):
     """
@@ -30,6 +47,10 @@ class WordDescramblerCore:
         Attributes:
             MAX_CANDIDATE_LENGTH (int): The maximum number of candidate letters supported.
             DEFAULT_CONFIG_PATH (str): The default configuration file path.
+            SEARCH_BACKENDS (tuple): The names of the supported search backends.
+            TRIE_MAX_CANDIDATE_LENGTH (int): The longest candidate string the 'auto' backend walks the trie for.
+                Longer candidates open up most of the trie, so they are scanned instead.
+            STREAM_BLOCK_SIZE (int): How many index rows an iter_matches worker scans before checking for a stop.
 
         Args:
             candidate_letters (str): The set of candidate letters.
@@ -43,12 +64,41 @@ class WordDescramblerCore:
         Properties:
             min_match_length (int): The minimum match length.
             limit_length (int or None): The limit length for candidate letters.
+            blanks (int): The number of wildcards ('?') in the candidate letters. Each one can stand for any letter.
+            blank_fills (dict): The letters the wildcards stand for in each match.
             candidate_letters (list): The list of candidate letters.
-            wordlist (set): The wordlist for the software.
+            wordlist (WordlistView or set): The wordlist for the software. Loaded wordlists are views of their index.
+            basic_wordlist (WordlistView): The words from the NLTK 'en-basic' corpus. A view of corpus_store when the
+                full corpus is loaded already, otherwise a view of an index of 'en-basic' alone.
+            full_wordlist (WordlistView): The words from the full NLTK words corpus, a view of corpus_store.
+            corpus_store (WordIndex): The index of every NLTK word, which holds the words of full_wordlist
+                and, once it is loaded, of basic_wordlist. Borrowed from the wordlist registry on first access.
+            index (WordIndex): The lookup index of the current wordlist, borrowed from the wordlist registry
+                when the wordlist comes from a file or an NLTK corpus.
+            wordlist_identity (str): A digest identifying the current wordlist, used in result cache keys.
+            search_backend (str): The backend used for sub-anagram searches ('python', 'trie', 'numpy' or 'process'),
+                with 'auto' resolved for the current candidate letters.
+            guess_counter (int): The number of words checked by the last search, summed over its workers.
+            scorer (Scorer): The scorer ranked searches use, built from the scorer setting on first access.
+            positional_index (PositionalIndex): The posting lists of the index for pattern queries, built on first use.
 
         Methods:
             search(): Perform a search with multiple threads.
-            print_matches(): Prints the list of matching words.
+            search_many(candidates): Search many candidate strings against one loaded index.
+            top_matches(letters, top_k, scorer): Return the best top_k matches for some letters, ranked by a scorer.
+            get_scorer(name): Return the scorer with the given name (see Scoring.SCORERS).
+            iter_phrases(letters, max_words, min_word_length, max_results): Yield the multi-word phrases that use
+                every candidate letter, as they are found.
+            match_pattern(pattern, letters): Return the words that fit a pattern such as 'c_t', with the open
+                positions filled from the candidate letters.
+            iter_matches(max_results, timeout, cancel_event): Yield matching words as they are found.
+            add_words(words): Add words to the wordlist, updating the index in place of a rebuild.
+            remove_words(words): Remove words from the wordlist, updating the index in place of a rebuild.
+            watch_wordlist(interval): Apply changes to the wordlist file to the loaded index as they happen.
+            release_wordlists(): Drop the loaded wordlist and return it to the wordlist registry.
+            close_pool(): Shut down the worker processes of the process backend.
+            iter_match_lines(matches): Yield the formatted lines of a result set one at a time.
+            print_matches(file): Prints the list of matching words, to stdout or a file.
 
         Static Methods:
             _load_config(config_full_file_location: str) -> WordDescramblerConfig: Load and return the configuration.
@@ -58,10 +108,11 @@ class WordDescramblerCore:
             _initialize_runtime_settings(self, kwargs: dict): Initialize the runtime settings.
             _initialize_wordlists(self): Initialize the wordlists.
             _extract_candidate_letters(letters: str) -> list: Convert the given letters to a list.
-            _search_worker(self, words_to_search): Search for words in a given list that match certain conditions.
+            _search_worker(self, start_index, end_index): Search a range of the index for words that can be built from the candidate letters.
             _add_match(self, word): Add a matching word to the match list.
             _load_wordlist(self): Load the wordlist from the path or use the basic/full wordlist.
-            _run_permutations(self, word_length: int): Run permutations of the candidate letters to find matches.
+            _run_permutations(self, word_length: int): Walk the index as a trie, consuming candidate letters, to find
+                matches up to word_length letters long.
             _chunks(iterable, size): Yield successive n-sized chunks from an iterable.
             _get_words_per_column(self, **kwargs): Get the number of words per column for printing matches.
 
@@ -70,7 +121,6 @@ class WordDescramblerCore:
             path_to_wordlist (Path): The path to the wordlist file.
             config_full_file_location (str): The full file location of the configuration file.
             _candidate_letters (list): The list of candidate letters.
-            guess_counter (int): The number of guesses made.
             match_list_lock (threading.Lock): The lock for accessing the match list.
             num_threads (int): The number of threads to use.
             _use_timedelta (bool): Flag to use timedelta for runtime.
@@ -82,19 +132,55 @@ class WordDescramblerCore:
             _min_match_length (int): The minimum match length.
             _verbose_mode (bool): Flag for verbose mode.
             _print_matches (bool): Flag to print matches.
+            _search_backend (str): The requested search backend.
+            _top_k (int): When set, search() only keeps the best top_k matches, ranked by the scorer. 0 keeps them all.
+            _scorer (Scorer or str): The scorer for ranked searches, or the name of one in Scoring.SCORERS.
+            _frequency_path (str): The word count file of the 'frequency' scorer.
+            _scorers (dict): The scorers built so far, by name.
+            _pattern (str): When set, search() matches this pattern instead (see match_pattern).
+            _phrase_max_words (int): The most words iter_phrases puts in a phrase. 0 for no limit.
+            _phrase_min_word_length (int): The shortest word iter_phrases uses.
+            wordlist_cache (WordlistCache or None): The compiled wordlist cache, or None if it is disabled.
+            wordlist_registry (WordlistRegistry or None): Where indexes are borrowed from, shared by every instance
+                in the process, or None if share_wordlists is off.
+            _wordlist_leases (list): The leases of the indexes borrowed from the registry, returned by close().
+            _wordlist_is_custom (bool): True if the wordlist was assigned directly instead of loaded from a source.
+            result_cache (ResultCache or None): The cache of search results, or None if it is disabled.
+            _wordlist_identity (tuple or None): The index and the digest wordlist_identity computed for it.
+            stream_progress (tuple): Rows scanned and total rows of the current iter_matches scan.
+            _stream_scanned (list): Rows scanned by each iter_matches worker.
+            _stream_total (int): The rows in the length buckets the current iter_matches scan covers.
+            last_batch_stats (dict): The query count, elapsed time and queries per second of the last search_many call.
+            _numpy_backend (NumpySearchBackend or None): The vectorized backend, built on first use.
+            _process_backend (ProcessPoolSearchBackend or None): The process pool backend, built on first use.
+            _positional_index (PositionalIndex or None): The posting lists for pattern queries, built on first use.
+            num_processes (int or None): The number of worker processes for the process backend.
             _use_basic_wordlist (bool): Flag to use the basic wordlist.
+            _watch_interval (float): Seconds between checks of the wordlist file by the watcher, or 0 for no watcher.
+            wordlist_watcher (WordlistWatcher or None): The watcher of the wordlist file, if one is running.
+            _index_lock (threading.Lock): Serializes updates of the index by add_words, remove_words and the watcher.
             runtime (Runtime): The runtime object.
-            _wordlist (set): The wordlist.
+            instrumentation (Instrumentation): The phase timings and per-worker counters, written with the runtime JSON.
+            _wordlist (WordlistView or set): The wordlist. A set only when one was assigned.
+            _index (WordIndex or None): The index built from the wordlist, or None until it is first needed.
             match_list (set): The list of matching words.
-            basic_wordlist (set): The set of words from the basic wordlist.
-            full_wordlist (set): The set of words from the full wordlist.
+            ranked_matches (list): The (word, score) pairs of the last search when top_k is set, best first.
+            _basic_wordlist (WordlistView or None): The basic wordlist, or None until it is first needed.
+            _corpus_store (WordIndex or None): The index of every NLTK word, or None until it is first needed.
     """
     MAX_CANDIDATE_LENGTH = 5000
+    SEARCH_BACKENDS = ('auto', 'python', 'trie', NumpySearchBackend.NAME, ProcessPoolSearchBackend.NAME)
+    TRIE_MAX_CANDIDATE_LENGTH = 8
+    STREAM_BLOCK_SIZE = 4096
+    _STREAM_POLL_SECONDS = 0.05
     DEFAULT_CONFIG_PATH = '../cfg/config.ini'
 
     def __init__(self, candidate_letters: str = None, path_to_wordlist: Path or str = None, **kwargs):
+        init_start = time.perf_counter()
         self.logger = kwargs.get('logger', getLogger('dummy_logger'))
-        self.config = self._load_config(kwargs.get('config_full_file_location', self.DEFAULT_CONFIG_PATH))
+        self.instrumentation = Instrumentation()
+        with self.instrumentation.phase('config_load'):
+            self.config = self._load_config(kwargs.get('config_full_file_location', self.DEFAULT_CONFIG_PATH))
 
         self._initialize_runtime_settings(kwargs)
 
@@ -103,11 +189,17 @@ class WordDescramblerCore:
         self._candidate_letters = candidate_letters#self._extract_candidate_letters(candidate_letters)
         self._initialize_wordlists()
 
-        self.guess_counter = 0
-
         self.match_list_lock = threading.Lock()
         self.num_threads = kwargs.get('num_threads', 4)
-        self.logger.info(f'{self.__class__.__name__} initialized with {self.num_threads} threads.')
+        self.num_processes = kwargs.get('num_processes', None)
+        self.last_batch_stats = {}
+        self._stream_scanned = []
+        self._stream_total = 0
+        self.wordlist_watcher = None
+        if self._watch_interval:
+            self.watch_wordlist(self._watch_interval)
+        self.logger.info(f'{self.__class__.__name__} initialized with {self.num_threads} threads '
+                         f'in {(time.perf_counter() - init_start) * 1000:.1f} ms.')
 
 
     def _load_config(self, config_full_file_location: str) -> WordDescramblerConfig:
@@ -129,43 +221,130 @@ class WordDescramblerCore:
         self._min_match_length = kwargs.get('min_match_length', self.config.getint('DEFAULT', 'min_match_length'))
         self._verbose_mode = kwargs.get('verbose_mode', self.config.getboolean('DEFAULT', 'verbose_mode'))
         self._print_matches = kwargs.get('print_matches', self.config.getboolean('SEARCH', 'print_matches'))
+        self._search_backend = kwargs.get('search_backend', self.config.get('SEARCH', 'search_backend'))
+        self._top_k = kwargs.get('top_k', self.config.getint('SEARCH', 'top_k'))
+        self._scorer = kwargs.get('scorer', self.config.get('SEARCH', 'scorer'))
+        self._frequency_path = kwargs.get('frequency_path', self.config.get('SEARCH', 'frequency_path'))
+        self._scorers = {}
+        self._pattern = kwargs.get('pattern', self.config.get('SEARCH', 'pattern'))
+        self._phrase_max_words = kwargs.get('phrase_max_words', self.config.getint('PHRASES', 'max_words'))
+        self._phrase_min_word_length = kwargs.get('phrase_min_word_length',
+                                                  self.config.getint('PHRASES', 'min_word_length'))
         self._use_basic_wordlist = kwargs.get('use_basic_wordlist',
                                               self.config.getboolean('WORDLIST', 'use_basic_wordlist'))
+        self._watch_interval = kwargs.get('watch_interval', self.config.getfloat('WORDLIST', 'watch_interval'))
+        result_cache_size = kwargs.get('result_cache_size', self.config.getint('SEARCH', 'result_cache_size'))
+        result_cache_path = kwargs.get('result_cache_path', self.config.get('SEARCH', 'result_cache_path'))
+        self.result_cache = (ResultCache(result_cache_size, result_cache_path or None, logger=self.logger)
+                             if result_cache_size > 0 or result_cache_path else None)
+        wordlist_cache_dir = kwargs.get('wordlist_cache_dir', self.config.get('WORDLIST', 'cache_dir'))
+        self.wordlist_cache = WordlistCache(wordlist_cache_dir, logger=self.logger) if wordlist_cache_dir else None
+        share_wordlists = kwargs.get('share_wordlists', self.config.getboolean('WORDLIST', 'share_wordlists'))
+        self.wordlist_registry = kwargs.get('wordlist_registry', WordlistRegistry.shared() if share_wordlists else None)
         self.runtime = Runtime(time.time(), use_timedelta=self._use_timedelta)
         self.logger.info(f'Runtime class settings and instance initialized.')
 
     def _initialize_wordlists(self):
         self._wordlist = set()
+        self._wordlist_is_custom = False
+        self._wordlist_identity = None
+        self._index = None
+        self._index_lock = threading.Lock()
+        self._numpy_backend = None
+        self._process_backend = None
+        self._positional_index = None
         self.match_list = set()
-        self.basic_wordlist = {w.lower() for w in words.words('en-basic')}
-        self.full_wordlist = {w.lower() for w in words.words()}
+        self.ranked_matches = []
+        self._basic_wordlist = None
+        self._corpus_store = None
+        self._wordlist_leases = []
         self.logger.info('Wordlists initialized.')
 
+    @staticmethod
+    def _nltk_words():
+        """
+        :return: The NLTK words corpus reader. nltk is imported here so that it is only loaded
+            when a corpus wordlist is actually used.
+        """
+        from nltk.corpus import words
+        return words
+
+    @property
+    def corpus_store(self) -> WordIndex:
+        """
+        :return: The index of the full NLTK words corpus. It is the single store of the corpus words:
+            the full corpus includes the 'en-basic' words, so both wordlists are views of it.
+        """
+        if self._corpus_store is None:
+            self._corpus_store = self._borrow_index(
+                self._nltk_source_key('all'), lambda: WordIndex(self._nltk_words().words(), logger=self.logger))
+        return self._corpus_store
+
+    @property
+    def basic_wordlist(self) -> WordlistView:
+        """
+        :return: The words of the 'en-basic' corpus. When the full corpus is loaded already, by this instance or
+            another one in the process, they are a view of corpus_store. Otherwise only 'en-basic' is read and indexed.
+        """
+        if self._basic_wordlist is None:
+            store = self._corpus_store
+            if store is None:
+                store = self._corpus_store = self._borrow_existing_index(self._nltk_source_key('all'))
+            if store is not None:
+                rows = {store.row_of(w if w.islower() else w.lower()) for w in self._nltk_words().words('en-basic')}
+                rows.discard(None)
+                self._basic_wordlist = WordlistView(store, array('I', sorted(rows)))
+            else:
+                self._basic_wordlist = WordlistView(self._borrow_index(
+                    self._nltk_source_key(['en-basic']),
+                    lambda: WordIndex(self._nltk_words().words('en-basic'), logger=self.logger)))
+        return self._basic_wordlist
+
+    @property
+    def full_wordlist(self) -> WordlistView:
+        return WordlistView(self.corpus_store)
+
     @staticmethod
     def _extract_candidate_letters(letters: str) -> list:
         return list(letters.lower())
 
-    def _search_worker(self, words_to_search):
+    def _search_worker(self, start_index, end_index, candidate_counts, candidate_mask, blanks=0, index=None):
         """
-        Searches for words in a given list that match certain conditions.
+        Searches a range of the index for words that can be built from the candidate letters.
+        Each letter may be used at most as often as it appears in the candidate letters,
+        and each blank may stand in for one more letter.
+
+        The range is a span of index.length_order, which _run_search limits to the length buckets the search wants,
+        so every row in it already has an acceptable length.
 
-        :param words_to_search: A list of words to search for matches.
+        :param start_index: The first position in index.length_order to search.
+        :param end_index: One past the last position in index.length_order to search.
+        :param candidate_counts: The letter-count vector of the candidate letters.
+        :param candidate_mask: The letter presence mask of the candidate letters.
+        :param blanks: The number of wildcards in the candidate letters.
+        :param index: The index to search, so every worker of one search uses the same one even if the wordlist
+            is updated meanwhile. Defaults to the current index.
         :return: None
 
         """
-        for word in words_to_search:
-            self.guess_counter += 1
-            if len(word) < self.min_match_length:
-                pass
-            elif self._use_all_letters and set(word) == set(self._candidate_letters):
-                self._add_match(word)
-                if self._verbose_mode:
-                    print(f"found a match at guess number {self.guess_counter:,}")
-            # FIXME: make sure that letters cannot be reused more than they appear in the candidate letters
-            elif not self._use_all_letters and all(letter in self._candidate_letters for letter in word):
-                self._add_match(word)
-                if self._verbose_mode:
-                    print(f"found a match at guess number {self.guess_counter:,}")
+        index = self.index if index is None else index
+        words = index.words
+        rows = index.length_order[start_index:end_index]
+        # this worker's own counters, so they are updated without a lock
+        counters = self.instrumentation.worker_counters()
+        if blanks:
+            rows = index.wildcard_rows(candidate_counts, candidate_mask, blanks, counters=counters, rows=rows)
+        else:
+            rows = index.sub_anagram_rows(candidate_counts, candidate_mask, counters=counters, rows=rows)
+        for row in rows:
+            self._add_match(words[row])
+            counters.matches += 1
+            if self._verbose_mode:
+                print(f"found a match at row {row:,}")
+
+    @property
+    def guess_counter(self) -> int:
+        return self.instrumentation.counters['scanned']
 
     @property
     def min_match_length(self) -> int:
@@ -192,6 +371,40 @@ class WordDescramblerCore:
                 self._limit_length = None
         return self._limit_length
 
+    def _length_bounds(self) -> tuple:
+        """
+        :return: The shortest and longest word length a search returns (the longest may be None for no limit).
+            With use_all_letters both are the number of candidate letters, wildcards included. A limit_length
+            longer than the candidate letters is clamped to them, as search_many and top_matches do.
+        """
+        min_length = self.min_match_length
+        if self._use_all_letters:
+            return len(self.candidate_letters), len(self.candidate_letters)
+        if self._limit_length:
+            return min_length, min(self._limit_length, len(self.candidate_letters))
+        return min_length, None
+
+    @property
+    def blanks(self) -> int:
+        """
+        :return: The number of wildcards (WordIndex.WILDCARD) in the candidate letters.
+        """
+        return WordIndex.count_blanks(self.candidate_letters)
+
+    @property
+    def blank_fills(self) -> dict:
+        """
+        :return: For each word in match_list, the letters the wildcards stand for in it.
+            Empty when the candidate letters have no wildcards.
+        """
+        if not self.blanks:
+            return {}
+        # the fixed letters of a pattern are part of every match, not something a wildcard stands for
+        candidate_counts = WordIndex.letter_counts(
+            ''.join(self.candidate_letters) + (PositionalIndex.fixed_letters(self._pattern) if self._pattern else ''))
+        return {word: self.index.blank_letters(WordIndex.letter_counts(word), candidate_counts)
+                for word in self.match_list}
+
     @property
     def candidate_letters(self) -> str:
         if len(self._candidate_letters) > self.MAX_CANDIDATE_LENGTH:
@@ -208,107 +421,1131 @@ class WordDescramblerCore:
         :return: The wordlist for the software.
         """
         if not self._wordlist:
+            if self._index is None and self.wordlist_registry is not None and not self._wordlist_is_custom:
+                # borrow the index, which holds the words, instead of loading them again
+                self.index
+            if self._index is not None:
+                # the index was borrowed, opened from the cache or updated, so it is the store of the words
+                return WordlistView(self._index)
             self._load_wordlist()
         return self._wordlist
 
     @wordlist.setter
     def wordlist(self, value: set):
         self._wordlist = value
+        self._wordlist_is_custom = True
+        self._index = None
 
-    def _load_wordlist(self):
+    @property
+    def index(self) -> WordIndex:
+        """
+        :return: The WordIndex for the current wordlist, built on first access and reused until the wordlist changes.
+
+        When the wordlist comes from a file or an NLTK corpus, the index is borrowed from the wordlist registry, so
+        every instance in the process using the same source shares one. When the wordlist cache is enabled, the index
+        is memory-mapped from its compiled form and the source is only parsed when the compiled form is missing or
+        stale. A wordlist file that has not been loaded yet is indexed as it is streamed in.
+        """
+        if self._index is None:
+            source_key = self._wordlist_source_key()
+            with self.instrumentation.phase('index_build'):
+                if source_key is not None:
+                    self._index = self._borrow_index(source_key, lambda: self._load_index(source_key))
+                else:
+                    self._index = self._build_index()
+        return self._index
+
+    def _load_index(self, source_key: dict) -> WordIndex:
+        if self.wordlist_cache is not None:
+            return self.wordlist_cache.load(source_key, self._build_index)
+        return self._build_index()
+
+    def _borrow_index(self, source_key: dict, build) -> WordIndex:
+        """
+        :return: The index for the source key from the wordlist registry, built with build() if it has none yet.
+            Without a registry, the index is just built.
+        """
+        if self.wordlist_registry is None:
+            return build()
+        index, lease = self.wordlist_registry.acquire(source_key, build, self)
+        self._wordlist_leases.append(lease)
+        return index
+
+    def _borrow_existing_index(self, source_key: dict) -> WordIndex or None:
+        """
+        :return: The index for the source key if the wordlist registry has it already, otherwise None.
+        """
+        if self.wordlist_registry is None:
+            return None
+        borrowed = self.wordlist_registry.acquire_existing(source_key, self)
+        if borrowed is None:
+            return None
+        self._wordlist_leases.append(borrowed[1])
+        return borrowed[0]
+
+    def release_wordlists(self):
+        """
+        Drop this instance's wordlist, index and search structures and return its leases to the wordlist registry.
+        The next search loads the wordlist again, borrowing it from the registry if it is still there.
+
+        :return: None
+        """
+        with self._index_lock:
+            if not self._wordlist_is_custom:
+                self._wordlist = set()
+            self._index = None
+            self._numpy_backend = None
+            self._positional_index = None
+            self._basic_wordlist = None
+            self._corpus_store = None
+            self._wordlist_identity = None
+            leases, self._wordlist_leases = self._wordlist_leases, []
+        for lease in leases:
+            lease()
+
+    def _build_index(self) -> WordIndex:
+        """
+        :return: The index of the wordlist. A wordlist loaded as a view already has one, so nothing is rebuilt:
+            the view's store, or an index of its rows gathered from the store.
+        """
+        source = self._index_source()
+        if isinstance(source, WordlistView):
+            return source.index()
+        return WordIndex(source, logger=self.logger)
+
+    def _index_source(self):
+        """
+        :return: The words to index: a WordlistReader streaming the wordlist file when the words have not been
+            loaded yet, otherwise the wordlist.
+        """
+        if self._wordlist or self._wordlist_is_custom:
+            return self._wordlist
         if self.path_to_wordlist.is_file():
-            with self.path_to_wordlist.open("r") as file:
-                self._wordlist = {line.strip().lower() for line in file.readlines()}
-                return
+            return self._wordlist_reader()
+        self._load_wordlist()
+        return self._wordlist
+
+    def _wordlist_reader(self) -> WordlistReader:
+        """
+        :return: A streaming reader for the wordlist file. Words that no candidate string could match
+            (non-alphabetic, or longer than MAX_CANDIDATE_LENGTH) are dropped while reading.
+        """
+        return WordlistReader(self.path_to_wordlist, max_word_length=self.MAX_CANDIDATE_LENGTH, logger=self.logger)
+
+    def _wordlist_source_key(self) -> dict or None:
+        """
+        :return: A description of where the wordlist is loaded from, for the wordlist cache,
+            or None if the wordlist was assigned directly.
+        """
+        if self._wordlist_is_custom:
+            return None
+        if self.path_to_wordlist.is_file():
+            return {'source': 'file', **WordlistCache.source_stamp(self.path_to_wordlist)}
         elif self.path_to_wordlist is not None and len(str(self.path_to_wordlist)) > 2:
             raise FileNotFoundError(f"wordlist not found at {self.path_to_wordlist}")
-        elif self._use_basic_wordlist:
-            self._wordlist = self.basic_wordlist
-            self.logger.info("basic_wordlist loaded.")
-        else:
-            self._wordlist = self.full_wordlist
-            self.logger.info("full_wordlist loaded.")
+        return self._nltk_source_key(['en-basic'] if self._use_basic_wordlist else 'all')
+
+    def _nltk_source_key(self, fileids) -> dict:
+        # keyed on the nltk version rather than the corpus files, so a cached start never has to import nltk
+        return {'source': 'nltk', 'fileids': fileids, 'nltk_version': self._nltk_version()}
+
+    @staticmethod
+    def _nltk_version() -> str:
+        from importlib import metadata
+        try:
+            return metadata.version('nltk')
+        except metadata.PackageNotFoundError:
+            return 'unknown'
+
+    @property
+    def search_backend(self) -> str:
+        """
+        :return: The name of the backend used for sub-anagram searches.
+
+        'numpy' falls back to 'python' with a warning when NumPy is not installed.
+        'auto' walks the trie for candidate strings up to TRIE_MAX_CANDIDATE_LENGTH letters, and scans
+        the wordlist (vectorized when NumPy is installed) for longer ones.
+        """
+        if self._search_backend not in self.SEARCH_BACKENDS:
+            raise ValueError(f"unknown search_backend '{self._search_backend}', "
+                             f"expected one of {', '.join(self.SEARCH_BACKENDS)}.")
+        if self._search_backend == NumpySearchBackend.NAME and not NumpySearchBackend.is_available():
+            self.logger.warning('numpy is not installed, falling back to the python search backend.')
+            self._search_backend = 'python'
+        if self._search_backend == 'auto':
+            if len(self.candidate_letters) <= self.TRIE_MAX_CANDIDATE_LENGTH:
+                return 'trie'
+            return NumpySearchBackend.NAME if NumpySearchBackend.is_available() else 'python'
+        return self._search_backend
+
+    def _load_wordlist(self):
+        with self.instrumentation.phase('wordlist_load'):
+            if self.path_to_wordlist.is_file():
+                # the file is read straight into an index, which then holds the only copy of the words
+                self._wordlist = WordlistView(WordIndex(self._wordlist_reader(), logger=self.logger))
+                self._index = None
+                return
+            elif self.path_to_wordlist is not None and len(str(self.path_to_wordlist)) > 2:
+                raise FileNotFoundError(f"wordlist not found at {self.path_to_wordlist}")
+            elif self._use_basic_wordlist:
+                self._wordlist = self.basic_wordlist
+                self.logger.info("basic_wordlist loaded.")
+            else:
+                self._wordlist = self.full_wordlist
+                self.logger.info("full_wordlist loaded.")
+            self._index = None
 
 
     def _add_match(self, word):
         with self.match_list_lock:
             self.match_list.add(word)
 
+    def _search_anagrams(self):
+        """
+        Find the words that use every candidate letter exactly as often as it appears, using the signature index.
+
+        :return: None
+        """
+        min_match_length = self.min_match_length
+        counters = self.instrumentation.worker_counters()
+        for word in self.index.anagrams(self.candidate_letters):
+            counters.scanned += 1
+            if len(word) >= min_match_length:
+                self._add_match(word)
+                counters.matches += 1
+
+    @property
+    def numpy_backend(self) -> NumpySearchBackend:
+        """
+        :return: The vectorized backend for the current index, built on first access.
+        """
+        if self._numpy_backend is None or self._numpy_backend.index is not self.index:
+            index = self.index
+            if self.wordlist_registry is not None:
+                # instances sharing a registered index share its arrays too
+                self._numpy_backend = self.wordlist_registry.derived(
+                    index, NumpySearchBackend.NAME, lambda: NumpySearchBackend(index, logger=self.logger))
+            else:
+                self._numpy_backend = NumpySearchBackend(index, logger=self.logger)
+        return self._numpy_backend
+
+    def _search_numpy(self):
+        """
+        Find the words that can be built from the candidate letters with the vectorized NumPy backend.
+
+        :return: None
+        """
+        min_length, max_length = self._length_bounds()
+        counters = self.instrumentation.worker_counters()
+        start, end = self.index.length_range(min_length, max_length)
+        counters.scanned = end - start
+        for word in self.numpy_backend.search(self.index.letter_counts(self.candidate_letters),
+                                               min_length, max_length, blanks=self.blanks):
+            self._add_match(word)
+            counters.matches += 1
+
+    def _search_process_pool(self):
+        """
+        Find the words that can be built from the candidate letters in a pool of worker processes
+        that share one copy of the index.
+
+        :return: None
+        """
+        if self._process_backend is None or self._process_backend.index is not self.index:
+            if self._process_backend is not None:
+                self._process_backend.close()
+            self._process_backend = ProcessPoolSearchBackend(self.index, num_processes=self.num_processes,
+                                                             logger=self.logger)
+        found = self._process_backend.search(self.index.letter_counts(self.candidate_letters),
+                                             self.index.letter_mask(self.candidate_letters),
+                                             *self._length_bounds())
+        counters = self.instrumentation.worker_counters()
+        start, end = self.index.length_range(*self._length_bounds())
+        counters.scanned = end - start
+        counters.matches = len(found)
+        with self.match_list_lock:
+            self.match_list.update(found)
+
+    def close(self):
+        """
+        Release the worker processes and shared memory held by the search backends, return the borrowed wordlists
+        to the wordlist registry, and close the on-disk tier of the result cache.
+
+        :return: None
+        """
+        if self.wordlist_watcher is not None:
+            self.wordlist_watcher.stop()
+            self.wordlist_watcher = None
+        self.close_pool()
+        self.release_wordlists()
+        if self.result_cache is not None:
+            self.result_cache.close()
+
+    def close_pool(self):
+        """
+        Shut down the worker processes and shared memory of the process backend, keeping everything else loaded.
+        The next process backend search starts a new pool, for example with a different num_processes.
+
+        :return: None
+        """
+        if self._process_backend is not None:
+            self._process_backend.close()
+            self._process_backend = None
+
+    def add_words(self, words) -> int:
+        """
+        Add words to the wordlist. The index is updated rather than rebuilt (see WordIndex.updated),
+        the result cache is invalidated, and the search backends pick up the new index on their next search.
+
+        :param words: An iterable of words. Words already in the wordlist are ignored.
+        :return: The number of words added.
+        """
+        return self._update_wordlist(added=words)[0]
+
+    def remove_words(self, words) -> int:
+        """
+        Remove words from the wordlist, updating the index like add_words.
+
+        :param words: An iterable of words. Words not in the wordlist are ignored.
+        :return: The number of words removed.
+        """
+        return self._update_wordlist(removed=words)[1]
+
+    def _update_wordlist(self, added=(), removed=(), from_source: bool = False) -> tuple:
+        """
+        Apply additions and removals to the wordlist and everything derived from it.
+
+        :param from_source: True when the changes bring the index in line with the wordlist file, so the index
+            matches its source again. Otherwise the wordlist becomes custom and is no longer tied to the file.
+        :return: The number of words added and removed.
+        """
+        added = {word.lower() for word in added}
+        removed = {word.lower() for word in removed} - added
+        with self._index_lock:
+            old_index = self.index
+            new_words = {word for word in added if old_index.row_of(word) is None}
+            gone_words = {word for word in removed if old_index.row_of(word) is not None}
+            if not new_words and not gone_words:
+                return 0, 0
+            self._index = old_index.updated(new_words, gone_words)
+            self._wordlist = WordlistView(self._index)
+            self._wordlist_is_custom = not from_source
+            if self.result_cache is not None:
+                self.result_cache.invalidate()
+        self.logger.info(f'wordlist updated: {len(new_words):,} words added, {len(gone_words):,} removed.')
+        return len(new_words), len(gone_words)
+
+    def watch_wordlist(self, interval: float = 1.0) -> WordlistWatcher:
+        """
+        Watch the wordlist file and apply its changes to the loaded index as they happen.
+
+        On a change the file is read again and compared with the index, and only the difference is applied, as with
+        add_words and remove_words. When the wordlist cache is enabled, the updated index is also compiled into it,
+        so other processes open the new version without parsing the file.
+
+        :param interval: Seconds between checks of the file.
+        :return: The running WordlistWatcher. close() stops it.
+        """
+        if not self.path_to_wordlist.is_file():
+            raise FileNotFoundError(f"only a wordlist file can be watched, {self.path_to_wordlist} is not one")
+        if self.wordlist_watcher is None:
+            self.wordlist_watcher = WordlistWatcher(self.path_to_wordlist, self._apply_wordlist_file_changes,
+                                                    interval, logger=self.logger)
+            self.wordlist_watcher.start()
+        return self.wordlist_watcher
+
+    def _apply_wordlist_file_changes(self):
+        source_words = self._wordlist_reader().read_set()
+        index = self.index
+        self._update_wordlist({word for word in source_words if index.row_of(word) is None},
+                              {word for word in index.words if word not in source_words}, from_source=True)
+        source_key = self._wordlist_source_key()
+        if self.wordlist_cache is not None and source_key is not None:
+            self.wordlist_cache.save(self.index, source_key)
+
+    def _run_permutations(self, word_length: int):
+        """
+        Find the words that can be built from the candidate letters by walking the index as a trie
+        and consuming one candidate letter per step. Prefixes the remaining letters cannot extend are pruned,
+        so only a fraction of the wordlist is visited for short candidate strings.
+
+        :param word_length: The longest word to look for, or None for no limit.
+        :return: None
+        """
+        min_length = self._length_bounds()[0]
+        counters = self.instrumentation.worker_counters()
+        for word in self.index.walk_prefixes(self.index.letter_counts(self.candidate_letters),
+                                             min_length, word_length, blanks=self.blanks, counters=counters):
+            counters.matches += 1
+            self._add_match(word)
+            if self._verbose_mode:
+                print(f"found match number {counters.matches:,}")
+
     def search(self):
         """
         Perform a search with multiple threads.
 
+        When use_all_letters is set, the search is a single signature lookup in the index instead.
+        When search_backend is 'numpy', the search is a single vectorized pass over the count matrix.
+        When search_backend is 'process', the scan is split across worker processes instead of threads.
+        When search_backend is 'trie', the index is walked as a trie instead of scanned (see _run_permutations).
+
+        When top_k is set, only the best top_k matches are kept, ranked by the scorer (see top_matches).
+        They are in ranked_matches, best first, as well as in match_list.
+
+        When pattern is set, the matches are the words that fit it, with the open positions drawn from the
+        candidate letters (see match_pattern).
+
+        match_list and the instrumentation counters are reset first, so they only cover this search. If the result
+        cache already holds the matches for these letters and options, they are used without searching.
+
         :return: None
         """
-        chunk_size = len(self.wordlist) // self.num_threads
+        self.match_list = set()
+        self.ranked_matches = []
+        self.instrumentation.reset_counters()
+        with self.instrumentation.phase('search'):
+            if self._pattern:
+                self.match_list.update(self._pattern_search(
+                    self._pattern, ''.join(self._candidate_letters or ''), self._use_all_letters,
+                    self._min_match_length, self.instrumentation.worker_counters()))
+            elif self._top_k:
+                self.ranked_matches = self._ranked_search(
+                    self.candidate_letters, self._top_k, self.scorer, self._use_all_letters,
+                    *self._length_bounds(), counted=True)
+                self.match_list.update(word for word, _ in self.ranked_matches)
+            else:
+                self._cached_or_run_search()
+        self._finish_search()
+
+    def _cached_or_run_search(self):
+        cache_key = None
+        if self.result_cache is not None:
+            cache_key = self._result_cache_key(self.candidate_letters, self._use_all_letters, self.min_match_length,
+                                               None if self._use_all_letters else self._length_bounds()[1])
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                self.logger.info('matches found in the result cache.')
+                self.match_list.update(cached)
+                return
+
+        self._run_search()
+        if cache_key is not None:
+            self.result_cache.put(cache_key, self.match_list)
+
+    def _result_cache_key(self, letters, use_all_letters: bool, min_match_length: int, limit_length) -> str:
+        return self.result_cache.make_key(self.index.signature(letters), use_all_letters, min_match_length,
+                                          limit_length, self.wordlist_identity)
+
+    @property
+    def wordlist_identity(self) -> str:
+        """
+        :return: A digest identifying the current wordlist, for the result cache. Wordlists loaded from a source
+            are identified by the source key; assigned wordlists by their words.
+        """
+        if self._wordlist_identity is None or self._wordlist_identity[0] is not self.index:
+            source_key = self._wordlist_source_key()
+            if source_key is not None:
+                digest = sha1(json.dumps(source_key, sort_keys=True).encode('utf-8'))
+            else:
+                digest = sha1('\n'.join(self.index.words).encode('utf-8'))
+            self._wordlist_identity = (self.index, digest.hexdigest())
+        return self._wordlist_identity[1]
+
+    def _run_search(self):
+        blanks = self.blanks
+        if self._use_all_letters and not blanks:
+            self.logger.info('searching the signature index for exact anagrams.')
+            self._search_anagrams()
+            return
+        search_backend = self.search_backend
+        if search_backend == 'trie':
+            self.logger.info('searching by walking the trie.')
+            self._run_permutations(self._length_bounds()[1])
+            return
+        if search_backend == NumpySearchBackend.NAME:
+            self.logger.info('searching with the numpy backend.')
+            self._search_numpy()
+            return
+        if search_backend == ProcessPoolSearchBackend.NAME and blanks:
+            self.logger.info('the process pool backend does not support wildcards, searching with threads.')
+        elif search_backend == ProcessPoolSearchBackend.NAME:
+            self.logger.info('searching with the process pool backend.')
+            self._search_process_pool()
+            return
+
+        index = self.index
+        candidate_counts = index.letter_counts(self.candidate_letters)
+        candidate_mask = index.letter_mask(self.candidate_letters)
+        # only the length buckets between the bounds are split between the threads
+        bucket_start, bucket_end = index.length_range(*self._length_bounds())
+        chunk_size = (bucket_end - bucket_start) // self.num_threads
         threads = []
-        self.logger.info(f'searching with {self.num_threads} threads and a chunk size of {chunk_size:,}.')
+        self.logger.info(f'searching {bucket_end - bucket_start:,} of {len(index):,} words '
+                         f'with {self.num_threads} threads and a chunk size of {chunk_size:,}.')
 
 
         for i in range(self.num_threads):
-            start_index = i * chunk_size
-            end_index = None if i == self.num_threads - 1 else (i + 1) * chunk_size
-            thread = threading.Thread(target=self._search_worker, args=(list(self.wordlist)[start_index:end_index],))
+            start_index = bucket_start + i * chunk_size
+            end_index = bucket_end if i == self.num_threads - 1 else bucket_start + (i + 1) * chunk_size
+            thread = threading.Thread(target=self._search_worker,
+                                      args=(start_index, end_index, candidate_counts, candidate_mask, blanks, index))
             threads.append(thread)
             thread.start()
 
         for thread in threads:
             thread.join()
 
+    def _finish_search(self):
         self.logger.info(f"{len(self.match_list):,} matches found.")
         self.logger.info(f"{self.runtime.runtime_string}")
-        self.runtime.write_runtime(as_json=True, file_path=self._rt_save_file_path)
+        self.logger.info(f"search took {self.instrumentation.timings['search'] * 1000:.1f} ms, "
+                         f"counters: {self.instrumentation.counters}")
+        self._write_runtime()
 
+    def _write_runtime(self):
+        """
+        Write the runtime JSON file, including the phase timings and counters of the instrumentation.
+
+        :return: None
+        """
+        self.runtime.write_runtime(as_json=True, save_file_path=self._rt_save_file_path,
+                                   extra={'instrumentation': self.instrumentation.as_dict()})
+
+
+    def search_many(self, candidates, **kwargs) -> dict:
+        """
+        Search many candidate strings against the one loaded index.
+
+        Unlike search(), this neither touches match_list nor writes the runtime file, so it can be called
+        repeatedly on one instance. Candidates that are anagrams of each other are searched once. Sub-anagram
+        queries that the python scan handles are grouped by letter mask, and each group shares one pass over
+        the index: the pass uses the group's combined letter counts, and each query then checks the survivors.
+        Queries with wildcards are searched one by one.
+
+        :param candidates: An iterable of candidate strings.
+        :keyword use_all_letters: Overrides the instance setting for this batch.
+        :keyword min_match_length: Overrides the instance setting for this batch.
+        :keyword limit_length: Overrides the instance setting for this batch.
+        :return: A dict mapping each candidate string to the set of its matches.
+            Throughput numbers for the batch are stored in last_batch_stats.
+        """
+        start_time = time.perf_counter()
+        use_all_letters = kwargs.get('use_all_letters', self._use_all_letters)
+        min_length = kwargs.get('min_match_length', self._min_match_length)
+        max_length = None if use_all_letters else kwargs.get('limit_length', self._limit_length)
+        index = self.index
+
+        queries = {}
+        for candidate in candidates:
+            queries.setdefault(index.signature(candidate), []).append(candidate)
+
+        found = {}
+        scan_groups = {}
+        cache_keys = {}
+        for signature in queries:
+            if self.result_cache is not None:
+                cache_keys[signature] = self._result_cache_key(signature, use_all_letters, min_length, max_length)
+                cached = self.result_cache.get(cache_keys[signature])
+                if cached is not None:
+                    found[signature] = cached
+                    continue
+            blanks = index.count_blanks(signature)
+            if len(signature) < min_length:
+                found[signature] = set()
+            elif use_all_letters and not blanks:
+                found[signature] = set(index.anagrams(signature))
+            else:
+                query_min, query_max = (len(signature), len(signature)) if use_all_letters else (min_length, max_length)
+                backend = self._batch_backend(signature)
+                candidate_counts = index.letter_counts(signature)
+                if backend == 'trie':
+                    found[signature] = set(index.walk_prefixes(candidate_counts, query_min, query_max, blanks=blanks))
+                elif backend == NumpySearchBackend.NAME:
+                    found[signature] = set(self.numpy_backend.search(candidate_counts, query_min, query_max,
+                                                                     blanks=blanks))
+                elif blanks:
+                    rows = index.wildcard_rows(candidate_counts, index.letter_mask(signature), blanks,
+                                               rows=index.length_rows(query_min, query_max))
+                    found[signature] = {index.words[row] for row in rows}
+                else:
+                    scan_groups.setdefault(index.letter_mask(signature), []).append(signature)
+        for candidate_mask, signatures in scan_groups.items():
+            found.update(self._scan_mask_group(candidate_mask, signatures, min_length, max_length))
+        for signature, cache_key in cache_keys.items():
+            self.result_cache.put(cache_key, found[signature])
+
+        results = {candidate: found[signature]
+                   for signature, same_letters in queries.items() for candidate in same_letters}
+        elapsed = time.perf_counter() - start_time
+        self.last_batch_stats = {'queries': len(results), 'unique_queries': len(queries),
+                                 'seconds': elapsed,
+                                 'queries_per_second': len(results) / elapsed if elapsed else 0.0}
+        self.logger.info(f"searched {len(results):,} candidates ({len(queries):,} unique) in {elapsed:.3f} seconds, "
+                         f"{self.last_batch_stats['queries_per_second']:,.1f} queries per second.")
+        return results
+
+    @property
+    def scorer(self) -> Scorer:
+        if not isinstance(self._scorer, Scorer):
+            self._scorer = self.get_scorer(self._scorer)
+        return self._scorer
+
+    def get_scorer(self, name: str) -> Scorer:
+        """
+        :return: The scorer with the given name, built once and then reused, so the frequency file is only read once.
+        """
+        if name not in self._scorers:
+            if name not in SCORERS:
+                raise ValueError(f"unknown scorer '{name}', expected one of {', '.join(SCORERS)}.")
+            if name == FrequencyScorer.NAME:
+                if not self._frequency_path:
+                    raise ValueError('the frequency scorer needs a frequency_path.')
+                self._scorers[name] = FrequencyScorer.from_file(self._frequency_path, logger=self.logger)
+            else:
+                self._scorers[name] = SCORERS[name]()
+        return self._scorers[name]
+
+    def top_matches(self, letters: str, top_k: int = None, scorer: Scorer or str = None, **kwargs) -> list:
+        """
+        Return the best top_k matches for some candidate letters, ranked by a scorer, without collecting or sorting
+        the rest of the result set.
+
+        Like search_many, this neither touches match_list nor depends on candidate_letters, so it can be called
+        from several threads. Ranked results are not kept in the result cache.
+
+        :param letters: The candidate letters. Wildcards are allowed.
+        :param top_k: How many matches to return. Defaults to the top_k setting.
+        :param scorer: A Scorer, or the name of one in Scoring.SCORERS. Defaults to the scorer setting.
+        :keyword use_all_letters: Overrides the instance setting for this query.
+        :keyword min_match_length: Overrides the instance setting for this query.
+        :keyword limit_length: Overrides the instance setting for this query.
+        :return: A list of (word, score) pairs, best first. Equal scores rank alphabetically.
+        """
+        top_k = top_k or self._top_k
+        if not top_k or top_k < 1:
+            raise ValueError('top_k must be at least 1.')
+        if scorer is None:
+            scorer = self.scorer
+        elif not isinstance(scorer, Scorer):
+            scorer = self.get_scorer(scorer)
+        use_all_letters = kwargs.get('use_all_letters', self._use_all_letters)
+        min_length = kwargs.get('min_match_length', self._min_match_length)
+        max_length = None if use_all_letters else kwargs.get('limit_length', self._limit_length)
+        return self._ranked_search(letters, top_k, scorer, use_all_letters, min_length, max_length)
+
+    def _ranked_search(self, letters: str, top_k: int, scorer: Scorer, use_all_letters: bool,
+                       min_length: int, max_length, counted: bool = False, stop=None) -> list:
+        """
+        The length buckets between the bounds are searched in order of the best score their words could reach
+        (Scorer.max_score), longest first when there is no bound. Each worker keeps a bounded heap of the best
+        top_k (score, -row) pairs it has found. After each bucket the heaps are merged to find the k-th best score
+        so far, and the search stops at the first bucket whose bound is below it.
+
+        :param counted: Register instrumentation counters, as search() does. top_matches does not, so repeated
+            calls do not accumulate workers.
+        :param stop: Called with no arguments before each length bucket. Once it returns True, the best matches
+            found so far are returned.
+        :return: A list of (word, score) pairs, best first.
+        """
+        index = self.index
+        letters = letters.lower()
+        candidate_counts = index.letter_counts(letters)
+        candidate_mask = index.letter_mask(letters)
+        blanks = index.count_blanks(letters)
+        if use_all_letters:
+            # keep min_length when it is longer, so there is nothing to search, as with search and search_many
+            max_length = len(letters)
+            min_length = max(min_length, max_length)
+        # a word longer than the candidate letters can never be built from them
+        longest = min(len(index.length_starts) - 2, len(letters))
+        lengths = [length for length in range(max(min_length, 1), min(max_length or longest, longest) + 1)
+                   if index.length_starts[length] < index.length_starts[length + 1]]
+        bounds = {length: scorer.max_score(length, letters) for length in lengths}
+        if None in bounds.values():
+            lengths.sort(reverse=True)
+        else:
+            lengths.sort(key=lambda length: (bounds[length], length), reverse=True)
+        use_numpy = self._batch_backend(letters) == NumpySearchBackend.NAME
+        num_workers = 1 if use_numpy else self.num_threads
+        heaps = [[] for _ in range(num_workers)]
+        counters = [self.instrumentation.worker_counters() if counted else None for _ in range(num_workers)]
+        threshold = None
+        searched = 0
+
+        for length in lengths:
+            if threshold is not None and bounds[length] is not None and bounds[length] < threshold:
+                break
+            if stop is not None and stop():
+                break
+            searched += 1
+            if use_numpy:
+                rows = self.numpy_backend.search_rows(candidate_counts, length, length, blanks=blanks)
+                if counted:
+                    counters[0].scanned += len(range(*index.length_range(length, length)))
+                self._push_ranked(heaps[0], rows, top_k, scorer, index, candidate_counts, blanks, counters[0])
+            elif use_all_letters and not blanks:
+                rows = [index.row_of(word) for word in index.anagrams(letters)]
+                self._push_ranked(heaps[0], rows, top_k, scorer, index, candidate_counts, blanks, counters[0])
+            else:
+                bucket_start, bucket_end = index.length_range(length, length)
+                chunk_size = -(-(bucket_end - bucket_start) // num_workers)
+                threads = [threading.Thread(target=self._ranked_worker,
+                                            args=(heaps[i], counters[i], start_index,
+                                                  min(start_index + chunk_size, bucket_end), candidate_counts,
+                                                  candidate_mask, blanks, top_k, scorer, index))
+                           for i, start_index in enumerate(range(bucket_start, bucket_end, chunk_size))]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            best = nlargest(top_k, chain(*heaps))
+            if len(best) == top_k:
+                threshold = best[-1][0]
+
+        self.logger.info(f'ranked search of {searched} of {len(lengths)} length buckets for the top {top_k:,} '
+                         f'matches by {scorer.__class__.__name__}.')
+        words = index.words
+        return [(words[-negative_row], score) for score, negative_row in nlargest(top_k, chain(*heaps))]
+
+    def _ranked_worker(self, heap: list, counters, start_index: int, end_index: int, candidate_counts,
+                       candidate_mask: int, blanks: int, top_k: int, scorer: Scorer, index: WordIndex):
+        rows = index.length_order[start_index:end_index]
+        if blanks:
+            rows = index.wildcard_rows(candidate_counts, candidate_mask, blanks, counters=counters, rows=rows)
+        else:
+            rows = index.sub_anagram_rows(candidate_counts, candidate_mask, counters=counters, rows=rows)
+        self._push_ranked(heap, rows, top_k, scorer, index, candidate_counts, blanks, counters)
+
+    @staticmethod
+    def _push_ranked(heap: list, rows, top_k: int, scorer: Scorer, index: WordIndex, candidate_counts,
+                     blanks: int, counters=None):
+        """
+        Score the words of some rows into a min-heap holding at most top_k (score, -row) pairs, so the heap always
+        holds the best of them seen so far and its first item is the one to beat.
+        """
+        words, counts = index.words, index.counts
+        for row in rows:
+            word = words[row]
+            fills = index.blank_letters(counts[row], candidate_counts) if blanks else ''
+            item = (scorer.score(word, fills), -row)
+            if len(heap) < top_k:
+                heappush(heap, item)
+            elif item > heap[0]:
+                heapreplace(heap, item)
+            if counters is not None:
+                counters.matches += 1
+
+    @property
+    def positional_index(self) -> PositionalIndex:
+        """
+        :return: The posting lists of the current index for pattern queries, built on first use.
+            Instances sharing a registered index share them too.
+        """
+        if self._positional_index is None or self._positional_index.index is not self.index:
+            index = self.index
+            with self.instrumentation.phase('positional_index_build'):
+                if self.wordlist_registry is not None:
+                    self._positional_index = self.wordlist_registry.derived(
+                        index, 'positional', lambda: PositionalIndex(index, logger=self.logger))
+                else:
+                    self._positional_index = PositionalIndex(index, logger=self.logger)
+        return self._positional_index
+
+    def match_pattern(self, pattern: str, letters: str = '', **kwargs) -> set:
+        """
+        Find the words that fit a pattern such as 'c_t' or '??ing': as long as the pattern, with its letters in the
+        same places, and with the open positions ('_', '?' or '.') filled from the candidate letters. Wildcards in the
+        candidate letters stand for any letter, as in a search. Without candidate letters, the open positions can
+        hold any letter, as in a crossword.
+
+        The words are found by intersecting the posting lists of the fixed letters (see PositionalIndex), and only
+        those words are checked against the candidate letters.
+
+        Like search_many, this neither touches match_list nor depends on candidate_letters, so it can be called
+        from several threads.
+
+        :param pattern: The pattern.
+        :param letters: The candidate letters for the open positions.
+        :keyword use_all_letters: Only match words that use every candidate letter, so the pattern must have as many
+            open positions as there are candidate letters. Overrides the instance setting.
+        :keyword min_match_length: Patterns shorter than this match nothing. Overrides the instance setting.
+        :return: The set of matching words.
+        """
+        if len(pattern) > self.MAX_CANDIDATE_LENGTH or len(letters) > self.MAX_CANDIDATE_LENGTH:
+            raise ValueError(f'Too many characters. Max characters supported is {self.MAX_CANDIDATE_LENGTH}')
+        return self._pattern_search(pattern, letters, kwargs.get('use_all_letters', self._use_all_letters),
+                                    kwargs.get('min_match_length', self._min_match_length))
+
+    def _pattern_search(self, pattern: str, letters: str, use_all_letters: bool, min_length: int,
+                        counters=None, stop=None) -> set:
+        """
+        :param stop: Called with no arguments between blocks of STREAM_BLOCK_SIZE rows. Once it returns True,
+            the matches found so far are returned.
+        """
+        fixed_letters = PositionalIndex.fixed_letters(pattern)
+        if len(pattern) < min_length:
+            return set()
+        if letters and use_all_letters and len(pattern) - len(fixed_letters) != len(letters):
+            return set()
+        index = self.index
+        pattern_rows = self.positional_index.rows(pattern)
+        if letters:
+            # a word fits when the candidate letters plus the fixed letters can build it, since it holds the fixed
+            # letters in their places already
+            pool = letters + fixed_letters
+            candidate_counts, candidate_mask = index.letter_counts(pool), index.letter_mask(pool)
+            blanks = index.count_blanks(letters)
+        found = set()
+        for block_start in range(0, len(pattern_rows), self.STREAM_BLOCK_SIZE):
+            if stop is not None and stop():
+                break
+            rows = pattern_rows[block_start:block_start + self.STREAM_BLOCK_SIZE]
+            if not letters:
+                if counters is not None:
+                    counters.scanned += len(rows)
+            elif blanks:
+                rows = index.wildcard_rows(candidate_counts, candidate_mask, blanks, counters=counters, rows=rows)
+            else:
+                rows = index.sub_anagram_rows(candidate_counts, candidate_mask, counters=counters, rows=rows)
+            found.update(index.words[row] for row in rows)
+        if counters is not None:
+            counters.matches += len(found)
+        return found
+
+    def iter_phrases(self, letters: str = None, max_words: int = None, min_word_length: int = None,
+                     max_results: int = None):
+        """
+        Yield the phrases that use every candidate letter exactly once, such as 'ice man' for 'cinema'.
+
+        The words a phrase may use are the sub-anagrams of the letters, found with search_many, so they come from
+        the result cache or the fastest backend. PhraseSolver then decomposes the letters into them.
+
+        :param letters: The candidate letters. Defaults to candidate_letters. Wildcards are not supported.
+        :param max_words: The most words in a phrase. Defaults to the max_words setting, 0 for no limit.
+        :param min_word_length: The shortest word in a phrase. Defaults to the min_word_length setting.
+        :param max_results: Stop after this many phrases. None finds them all.
+        :return: Generator of phrases, each a tuple of words, as they are found.
+        """
+        letters = self._candidate_letters if letters is None else letters
+        if len(letters) > self.MAX_CANDIDATE_LENGTH:
+            raise ValueError(f'Too many candidate letters. Max characters supported is {self.MAX_CANDIDATE_LENGTH}')
+        if WordIndex.count_blanks(letters):
+            raise ValueError('phrase searches do not support wildcards.')
+        max_words = self._phrase_max_words if max_words is None else max_words
+        min_word_length = self._phrase_min_word_length if min_word_length is None else min_word_length
+        words = self.search_many([letters], use_all_letters=False, min_match_length=min_word_length,
+                                 limit_length=None)[letters]
+        solver = PhraseSolver(letters, words, max_words, min_word_length, logger=self.logger)
+        yield from solver.iter_phrases(max_results)
+
+    def iter_matches(self, max_results: int = None, timeout: float = None, cancel_event: threading.Event = None):
+        """
+        Yield matching words as they are found, instead of after the whole search has finished.
+
+        The search stops as soon as the consumer has enough: after max_results words, once timeout seconds
+        have passed, when cancel_event is set, or when the generator is closed (for example by breaking out of
+        the loop). Scanning workers check for a stop between blocks of STREAM_BLOCK_SIZE rows, trie walks at every
+        node, ranked searches between length buckets and pattern searches between blocks of rows, so a cancel or
+        timeout is noticed promptly even by searches that find few matches. match_list is not touched and no
+        runtime file is written.
+
+        The pattern and top_k settings apply as in search(). Pattern matches and ranked matches are only known once
+        their search is done, so they are yielded afterwards, ranked matches best first.
+
+        :param max_results: Stop after this many words, or None for every match.
+        :param timeout: Stop after this many seconds, or None for no time limit.
+        :param cancel_event: A threading.Event that stops the search when set, for example from another thread.
+        :return: Generator of matching words, in no particular order.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        stop_event = threading.Event()
+
+        def stopped() -> bool:
+            return (stop_event.is_set() or (cancel_event is not None and cancel_event.is_set())
+                    or (deadline is not None and time.monotonic() > deadline))
+
+        self._stream_scanned = []
+        self._stream_total = 0
+        cache_key = None
+        source = None
+        # as in search(), pattern and ranked matches are not kept in the result cache
+        if self.result_cache is not None and not (self._pattern or self._top_k):
+            cache_key = self._result_cache_key(self.candidate_letters, self._use_all_letters, self.min_match_length,
+                                               None if self._use_all_letters else self._length_bounds()[1])
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                source = iter(cached)
+                cache_key = None
+        if source is None:
+            source = self._stream_search(stop_event, stopped)
+
+        found = []
+        try:
+            for word in source:
+                if stopped():
+                    self.logger.info(f'match stream stopped early after {len(found):,} matches.')
+                    return
+                if word is None:
+                    # a scan poll with nothing new, only here so that timeouts and cancels are noticed
+                    continue
+                yield word
+                found.append(word)
+                if max_results is not None and len(found) >= max_results:
+                    return
+            if stopped():
+                # the search may have ended early without a match left to notice it by, so found is incomplete
+                self.logger.info(f'match stream stopped early after {len(found):,} matches.')
+            elif cache_key is not None:
+                self.result_cache.put(cache_key, found)
+        finally:
+            stop_event.set()
+            close = getattr(source, 'close', None)
+            if close is not None:
+                close()
+
+    def _stream_search(self, stop_event: threading.Event, stop):
+        """
+        :param stop: Called with no arguments, returns True once iter_matches should stop.
+        :return: Generator of matching words for iter_matches, using the strategy search() would use.
+            Scans yield None while they wait for workers, so the consumer can check its stop conditions.
+            The other strategies call stop as they go, and end early once it returns True.
+        """
+        if self._pattern:
+            return iter(self._pattern_search(self._pattern, ''.join(self._candidate_letters or ''),
+                                             self._use_all_letters, self._min_match_length, stop=stop))
+        if self._top_k:
+            return iter([word for word, _ in self._ranked_search(self.candidate_letters, self._top_k, self.scorer,
+                                                                 self._use_all_letters, *self._length_bounds(),
+                                                                 stop=stop)])
+        index = self.index
+        blanks = self.blanks
+        if self._use_all_letters and not blanks:
+            return iter(index.anagrams(self.candidate_letters))
+        min_length, max_length = self._length_bounds()
+        candidate_counts = index.letter_counts(self.candidate_letters)
+        if self.search_backend == 'trie':
+            return index.walk_prefixes(candidate_counts, min_length, max_length, blanks=blanks, stop=stop)
+        return self._stream_scan(stop_event, candidate_counts, index.letter_mask(self.candidate_letters),
+                                 min_length, max_length, blanks)
+
+    def _stream_scan(self, stop_event: threading.Event, candidate_counts, candidate_mask: int,
+                     min_length: int, max_length, blanks: int):
+        """
+        Scan the index in blocks on num_threads worker threads and yield their matches as they arrive.
+        The NumPy backend is used per block when it is selected; otherwise each block is scanned in python.
+        The blocks are spans of index.length_order covering only the length buckets between the bounds.
+        """
+        bucket_start, bucket_end = self.index.length_range(min_length, max_length)
+        blocks = [(start_index, min(start_index + self.STREAM_BLOCK_SIZE, bucket_end))
+                  for start_index in range(bucket_start, bucket_end, self.STREAM_BLOCK_SIZE)]
+        self._stream_total = bucket_end - bucket_start
+        use_numpy = self.search_backend == NumpySearchBackend.NAME
+        if use_numpy:
+            self.numpy_backend
+        found_queue = queue.Queue()
+        # one slot per worker, so progress is counted without a lock
+        self._stream_scanned = [0] * self.num_threads
+        workers = [threading.Thread(target=self._stream_worker, daemon=True,
+                                    args=(i, blocks[i::self.num_threads], candidate_counts, candidate_mask,
+                                          blanks, min_length, max_length, use_numpy, found_queue, stop_event))
+                   for i in range(self.num_threads)]
+        for worker in workers:
+            worker.start()
+        running = len(workers)
+        try:
+            while running:
+                try:
+                    words = found_queue.get(timeout=self._STREAM_POLL_SECONDS)
+                except queue.Empty:
+                    yield None
+                    continue
+                if words is None:
+                    running -= 1
+                else:
+                    yield from words
+        finally:
+            stop_event.set()
+
+    def _stream_worker(self, worker_number: int, blocks, candidate_counts, candidate_mask: int, blanks: int,
+                       min_length: int, max_length, use_numpy: bool, found_queue: queue.Queue,
+                       stop_event: threading.Event):
+        index = self.index
+        words, length_order = index.words, index.length_order
+        try:
+            for start_index, end_index in blocks:
+                if stop_event.is_set():
+                    break
+                if use_numpy:
+                    found = self.numpy_backend.search(candidate_counts, min_length, max_length,
+                                                      start_index, end_index, blanks=blanks)
+                else:
+                    rows = length_order[start_index:end_index]
+                    if blanks:
+                        rows = index.wildcard_rows(candidate_counts, candidate_mask, blanks, rows=rows)
+                    else:
+                        rows = index.sub_anagram_rows(candidate_counts, candidate_mask, rows=rows)
+                    found = [words[row] for row in rows]
+                self._stream_scanned[worker_number] += end_index - start_index
+                if found:
+                    found_queue.put(found)
+        finally:
+            found_queue.put(None)
+
+    @property
+    def stream_progress(self) -> tuple:
+        """
+        :return: (rows scanned, total rows) for the scan behind the current iter_matches call. The total only
+            counts the length buckets the scan covers.
+            The total is 0 when the search is not a scan (exact lookups, trie walks and cached results).
+        """
+        if not self._stream_scanned:
+            return 0, 0
+        return sum(self._stream_scanned), self._stream_total
+
+    def _batch_backend(self, signature: str) -> str:
+        """
+        :return: The backend search_many uses for one candidate string, resolved like search_backend.
+        """
+        if self._search_backend == 'auto':
+            if len(signature) <= self.TRIE_MAX_CANDIDATE_LENGTH:
+                return 'trie'
+            return NumpySearchBackend.NAME if NumpySearchBackend.is_available() else 'python'
+        if self._search_backend == NumpySearchBackend.NAME and NumpySearchBackend.is_available():
+            return NumpySearchBackend.NAME
+        return 'trie' if self._search_backend == 'trie' else 'python'
+
+    def _scan_mask_group(self, candidate_mask: int, signatures: list, min_length: int, max_length: int) -> dict:
+        """
+        Search every candidate signature sharing one letter mask in a single pass over the index.
+
+        :return: A dict mapping each signature to the set of its matches.
+        """
+        index = self.index
+        query_counts = {signature: index.letter_counts(signature) for signature in signatures}
+        group_counts = [max(letter_counts) for letter_counts in zip(*query_counts.values())]
+        found = {signature: set() for signature in signatures}
+        words, counts = index.words, index.counts
+        for row in index.sub_anagram_rows(group_counts, candidate_mask, rows=index.length_rows(min_length, max_length)):
+            word_counts = counts[row]
+            for signature, candidate_counts in query_counts.items():
+                if all(map(le, word_counts, candidate_counts)):
+                    found[signature].add(words[row])
+        return found
 
     @staticmethod
     def _chunks(iterable, size):
         """
         Yield successive n-sized chunks from an iterable.
+        Works on any iterable, including generators of streamed matches, without reading it all first.
 
         :param iterable: The iterable to chunk.
         :param size: The size of each chunk.
-        :return: Generator of chunks.
+        :return: Generator of chunks, as lists.
         """
-        for i in range(0, len(iterable), size):
-            yield iterable[i:i + size]
+        iterator = iter(iterable)
+        chunk = list(islice(iterator, size))
+        while chunk:
+            yield chunk
+            chunk = list(islice(iterator, size))
 
-    def _get_words_per_column(self, **kwargs):
+    def _get_words_per_column(self, number_of_matches: int = None, **kwargs):
+        """
+        :param number_of_matches: The number of matches to lay out. Defaults to the size of match_list;
+            give it when the matches are streamed.
+        :return: The number of words on each line of column output.
+        """
         words_per_column = kwargs.get('words_per_column', self.config.getint('SEARCH', 'words_per_column'))
         column_number = kwargs.get('column_number', self.config.getint('SEARCH', 'column_number'))
+        if number_of_matches is None:
+            number_of_matches = len(self.match_list)
 
         if words_per_column >= 1 and column_number != 0:
             raise AttributeError('words_per_column and column number kwargs cannot be used at the same time.')
         elif words_per_column >= 1:
-            column_number = int(len(self.match_list) / words_per_column)
+            column_number = int(number_of_matches / words_per_column)
             if column_number == 0:
                 column_number = 1
 
         return column_number
 
-    def print_matches(self, **kwargs):
+    def iter_match_lines(self, matches=None, number_of_matches: int = None, **kwargs):
         """
-        Prints the list of matching words.
+        Yield the formatted lines of a result set one at a time, so it never has to be held as one string.
+        When the candidate letters have wildcards, each word is followed by the letters they stand for.
 
-        :return: None
+        :param matches: An iterable of matching words. Defaults to ranked_matches in rank order after a top_k search,
+            otherwise to match_list, sorted in column mode.
+        :param number_of_matches: The number of matches, needed for words_per_column layouts of streamed matches
+            that have no len().
+        :return: Generator of lines, without their line endings.
         """
         use_columns = kwargs.get('use_columns', self.config.getboolean('SEARCH', 'use_columns'))
-        final_str = str()
-        print("Matching Words:")
-        if use_columns:
-            column_number = self._get_words_per_column(**kwargs)
+        if matches is None and self.ranked_matches:
+            matches = [word for word, _ in self.ranked_matches]
+        elif matches is None:
+            matches = sorted(self.match_list) if use_columns else self.match_list
+        if number_of_matches is None and hasattr(matches, '__len__'):
+            number_of_matches = len(matches)
+        blank_fills = self.blank_fills
+        if blank_fills:
+            wildcard = self.index.WILDCARD
+            matches = (f"{match} ({wildcard}={blank_fills[match]})" if blank_fills.get(match) else match
+                       for match in matches)
 
-            for chunk in self._chunks(sorted(list(self.match_list)), column_number):
-                print(f"\t{', '.join(chunk)}")
-                final_str += f"\t{', '.join(chunk)}\n"
+        if use_columns:
+            column_number = self._get_words_per_column(number_of_matches=number_of_matches, **kwargs)
+            for chunk in self._chunks(matches, column_number):
+                yield ', '.join(chunk)
         else:
-            for match in self.match_list:
-                print(f"\t{match}")
-                final_str += f"\t{match}\n"
-        print(f"{len(self.match_list):,} matches found.")
+            yield from matches
+
+    def print_matches(self, file=None, **kwargs):
+        """
+        Prints the list of matching words.
+        When the candidate letters have wildcards, each word is followed by the letters they stand for.
+
+        The lines are written to the stream as they are formatted. When a stream or a path is given, the full output
+        is never built in memory, so pass sys.stdout to print a large result set without keeping its text.
+
+        The time this takes is the 'output_formatting' phase of the instrumentation. After a search,
+        the runtime file is written again so that it includes it.
+
+        :param file: Where to print: a writable text stream or the path of a file to write. Defaults to stdout.
+        :return: The formatted match lines when file is not given, otherwise None.
+        """
+        with self.instrumentation.phase('output_formatting'):
+            if isinstance(file, (str, Path)):
+                with open(file, 'w', encoding='utf-8') as f:
+                    self._print_match_lines(f, **kwargs)
+                final_str = None
+            elif file is not None:
+                self._print_match_lines(file, **kwargs)
+                final_str = None
+            else:
+                lines = []
+                self._print_match_lines(sys.stdout, lines, **kwargs)
+                final_str = ''.join(lines)
+        if 'search' in self.instrumentation.timings:
+            self._write_runtime()
         return final_str
 
+    def _print_match_lines(self, file, lines: list = None, **kwargs):
+        """
+        :param lines: A list the formatted match lines are also appended to, or None.
+        """
+        file.write("Matching Words:\n")
+        for line in self.iter_match_lines(**kwargs):
+            line = f"\t{line}\n"
+            file.write(line)
+            if lines is not None:
+                lines.append(line)
+        file.write(f"{len(self.match_list):,} matches found.\n")
 
 if __name__ == '__main__':
     WD = WordDescramblerCore(candidate_letters='AndrewJamesMcSparron')#, use_basic_wordlist=True,)
     WD.search()
-    WD.print_matches()
\ No newline at end of file
+    WD.print_matches()
+    print("Phrases:")
+    for phrase in WD.iter_phrases(max_results=25):
+        print(f"\t{' '.join(phrase)}")
\ No newline at end of file
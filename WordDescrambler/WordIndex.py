@@ -0,0 +1,770 @@
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Set
+from logging import getLogger
+from operator import le
+from string import ascii_lowercase
+
+
+class CountRows:
+    """
+    A read-only sequence of fixed-width letter-count rows stored back to back in one buffer.
+
+    The buffer can be a bytearray built in memory or a slice of a memory-mapped cache file, so the rows
+    can be read without materializing one object per word.
+
+    Attributes:
+        buffer (bytes-like): The rows, `width` bytes each.
+        width (int): The number of bytes in a row.
+    """
+    __slots__ = ('buffer', 'width')
+
+    def __init__(self, buffer, width: int):
+        self.buffer = buffer
+        self.width = width
+
+    def __len__(self):
+        return len(self.buffer) // self.width
+
+    def __getitem__(self, row: int) -> bytes:
+        offset = row * self.width
+        return bytes(self.buffer[offset:offset + self.width])
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self[row]
+
+
+class PackedWords:
+    """
+    A read-only sequence of words stored as one UTF-8 blob plus an offset array.
+
+    Attributes:
+        blob (bytes-like): The encoded words, back to back.
+        offsets (sequence of int): Where each word starts in `blob`, followed by the end of the last word.
+    """
+    __slots__ = ('blob', 'offsets')
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    @classmethod
+    def from_words(cls, words):
+        """
+        :param words: An iterable of words, in the order they are to be stored.
+        :return: The words packed into a bytearray blob and an array of offsets.
+        """
+        blob = bytearray()
+        offsets = array('I', [0])
+        for word in words:
+            blob += word.encode('utf-8')
+            offsets.append(len(blob))
+        return cls(blob, offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __iter__(self):
+        blob, offsets = self.blob, self.offsets
+        for row in range(len(offsets) - 1):
+            yield str(blob[offsets[row]:offsets[row + 1]], 'utf-8')
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self[i] for i in range(*row.indices(len(self)))]
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError('word index out of range')
+        return str(self.blob[self.offsets[row]:self.offsets[row + 1]], 'utf-8')
+
+
+class WordIndex:
+    """
+    Precomputed lookup structures for a loaded wordlist.
+
+    The index is built once per wordlist and then shared by every search against it.
+    Every word gets a 26 slot letter-count vector and a 26 bit presence mask, stored in columns that line up
+    with `words`. Sub-anagram searches reject most words with a single AND against the candidate mask and only
+    compare the counts of the words that survive it.
+
+    The letter-count vector doubles as the word's signature: every anagram of a word has the same one, and
+    repeated letters are kept, so 'tact' is not an anagram of 'cat'. `signature_order` lists the rows sorted
+    by signature, which makes "use all letters" searches a binary search instead of a scan of the wordlist.
+
+    The words and columns are flat arrays, so an index can also be opened straight from a memory-mapped cache file
+    (see WordlistCache) with `from_columns`.
+
+    Attributes:
+        ALPHABET (str): The letters that are indexed. Each one owns a slot in the count vectors and a bit in the masks.
+        WILDCARD (str): The blank tile character. Each one in the candidate letters stands for any one letter.
+        OTHER_BIT (int): The mask bit set for words containing characters outside ALPHABET. Candidates never set it,
+            so those words are rejected by the prefilter.
+        words (PackedWords): The sorted, deduplicated words in the index, packed into one buffer rather than held as
+            one str object each.
+        counts (CountRows): The letter-count vector of each word, as 26 bytes.
+        masks (sequence of int): The letter presence mask of each word.
+        lengths (sequence of int): The length of each word.
+        signature_order (sequence of int): The rows sorted by letter-count vector, then by word.
+        length_order (sequence of int): The rows bucketed by word length: sorted by length, then by word.
+        length_starts (sequence of int): For each length L, where the bucket of L-letter words starts in
+            length_order. Scans that only want some lengths read just those buckets (see length_range).
+
+    Methods:
+        from_columns(words, counts, masks, lengths, signature_order): Create an index from prebuilt columns,
+            such as those of a WordIndexBuilder.
+        row_of(word): Return the row of a word, or None.
+        bucket_by_length(lengths): Return the length_order and length_starts columns for the given word lengths.
+        length_range(min_length, max_length): Return the span of length_order holding the words between two lengths.
+        length_rows(min_length, max_length): Return the rows of the words between two lengths.
+        updated(added, removed): Return a copy of the index with words added and removed, without a rebuild.
+        subset(rows): Return an index of some of the rows, gathered from this index's columns.
+        signature(letters): Return the canonical signature of the given letters.
+        letter_counts(letters): Return the letter-count vector of the given letters.
+        letter_mask(letters): Return the letter presence mask of the given letters.
+        anagrams(letters): Return every word that uses exactly the given letters.
+        sub_anagrams(candidate_counts, candidate_mask, start_index, end_index): Yield the words in a range of the
+            index that can be built from the candidate letters.
+        sub_anagram_rows(candidate_counts, candidate_mask, start_index, end_index): Like sub_anagrams, but yield
+            row numbers.
+        count_blanks(letters): Return how many wildcards the given letters contain.
+        wildcard_rows(candidate_counts, candidate_mask, blanks, start_index, end_index): Yield the rows that can be
+            built from the candidate letters plus a number of blanks.
+        blank_letters(word_counts, candidate_counts): Return the letters the blanks stand for in a match.
+        walk_prefixes(candidate_counts, min_length, max_length): Generate the words that can be built from the
+            candidate letters by walking the sorted words as a trie.
+    """
+    ALPHABET = ascii_lowercase
+    WILDCARD = '?'
+    OTHER_BIT = 1 << len(ALPHABET)
+    _LETTER_SLOTS = {letter: slot for slot, letter in enumerate(ALPHABET)}
+    _LETTER_BITS = {letter: 1 << slot for slot, letter in enumerate(ALPHABET)}
+
+    def __init__(self, wordlist, **kwargs):
+        """
+        :param wordlist: Any iterable of words, including a generator or a WordlistReader, which is indexed
+            while it is read (see WordIndexBuilder).
+        """
+        self.logger = kwargs.get('logger', getLogger('dummy_logger'))
+        self.words, self.counts, self.masks, self.lengths, self.signature_order = WordIndexBuilder(wordlist).columns()
+        self.length_order, self.length_starts = self.bucket_by_length(self.lengths)
+        self.logger.info(f'{self.__class__.__name__} built with {len(self.words):,} words.')
+
+    @classmethod
+    def from_columns(cls, words, counts: CountRows, masks, lengths, signature_order,
+                     length_order=None, length_starts=None, **kwargs):
+        """
+        Create an index from columns that were already built, for example by WordlistCache.
+        The length buckets are computed from `lengths` unless they are given too.
+
+        :return: A WordIndex that reads straight from the given columns.
+        """
+        index = cls.__new__(cls)
+        index.logger = kwargs.get('logger', getLogger('dummy_logger'))
+        index.words = words
+        index.counts = counts
+        index.masks = masks
+        index.lengths = lengths
+        index.signature_order = signature_order
+        if length_order is None or length_starts is None:
+            length_order, length_starts = cls.bucket_by_length(lengths)
+        index.length_order = length_order
+        index.length_starts = length_starts
+        index.logger.info(f'{cls.__name__} opened with {len(words):,} words.')
+        return index
+
+    @staticmethod
+    def bucket_by_length(lengths) -> tuple:
+        """
+        :param lengths: The length of each word.
+        :return: (length_order, length_starts): the rows sorted by length, then by row, and for every length L
+            up to one past the longest word, the position in length_order where the words of length L start.
+        """
+        length_order = array('I', sorted(range(len(lengths)), key=lengths.__getitem__))
+        return length_order, WordIndex._length_starts(Counter(lengths))
+
+    @staticmethod
+    def _length_starts(sizes: Counter):
+        """
+        :param sizes: The number of words of each length.
+        :return: The length_starts column for those bucket sizes.
+        """
+        length_starts = array('I', [0])
+        for length in range(max((length for length, size in sizes.items() if size), default=0) + 1):
+            length_starts.append(length_starts[-1] + sizes.get(length, 0))
+        return length_starts
+
+    def length_range(self, min_length: int = 0, max_length: int = None) -> tuple:
+        """
+        :param min_length: The shortest word length wanted.
+        :param max_length: The longest word length wanted, or None (or 0) for no limit.
+        :return: (start, end), the positions in length_order holding the words between the two lengths.
+        """
+        starts = self.length_starts
+        longest = len(starts) - 2
+        start = starts[min(max(min_length, 0), longest + 1)]
+        end = starts[longest + 1] if not max_length or max_length >= longest else starts[max(max_length + 1, 0)]
+        return start, max(start, end)
+
+    def length_rows(self, min_length: int = 0, max_length: int = None):
+        """
+        :return: The rows of the words between the two lengths, grouped by length (see length_range).
+        """
+        return self.length_order[slice(*self.length_range(min_length, max_length))]
+
+    def __len__(self):
+        return len(self.words)
+
+    def row_of(self, word: str) -> int or None:
+        """
+        :return: The row of the word, or None if it is not in the index.
+        """
+        row = bisect_left(self.words, word)
+        if row < len(self.words) and self.words[row] == word:
+            return row
+        return None
+
+    def updated(self, added=(), removed=()):
+        """
+        Return a copy of the index with some words added and others removed, without rebuilding it.
+
+        The rows of unchanged words are copied across in blocks, only the added words have their columns computed,
+        and signature_order and length_order are renumbered instead of sorted again. A word that is both added and removed is kept.
+        The index itself is not changed, so searches that are still using it are not disturbed.
+
+        :param added: Words to add. Words already in the index are ignored.
+        :param removed: Words to remove. Words not in the index are ignored.
+        :return: The updated WordIndex, or this index if nothing changed.
+        """
+        added = {word if word.islower() else word.lower() for word in added}
+        removed = {word if word.islower() else word.lower() for word in removed} - added
+        removed_rows = sorted(row for row in map(self.row_of, removed) if row is not None)
+        new_words, new_counts, new_masks, new_lengths, _ = WordIndexBuilder(
+            word for word in added if self.row_of(word) is None).columns()
+        if not removed_rows and not new_words:
+            return self
+
+        width = self.counts.width
+        old_words, old_counts, old_masks, old_lengths = self.packed_words, self.counts.buffer, self.masks, self.lengths
+        old_blob, old_offsets = old_words.blob, old_words.offsets
+        new_words = list(new_words)
+        insert_points = [bisect_left(old_words, word) for word in new_words]
+        blob, offsets, counts, masks, lengths = bytearray(), array('I', [0]), bytearray(), array('I'), array('H')
+        # remap[old row] is the row's new number, or -1 if it was removed
+        remap = array('i')
+        inserted_rows = []
+        cursor = 0
+        removed_set = set(removed_rows)
+        next_insert = 0
+        for cut in sorted(set(insert_points) | removed_set) + [len(old_words)]:
+            if cursor < cut:
+                remap.extend(range(len(offsets) - 1, len(offsets) - 1 + cut - cursor))
+                shift = len(blob) - old_offsets[cursor]
+                blob += old_blob[old_offsets[cursor]:old_offsets[cut]]
+                offsets.extend(offset + shift for offset in old_offsets[cursor + 1:cut + 1])
+                counts += old_counts[cursor * width:cut * width]
+                masks.frombytes(bytes(old_masks[cursor:cut]))
+                lengths.frombytes(bytes(old_lengths[cursor:cut]))
+                cursor = cut
+            while next_insert < len(new_words) and insert_points[next_insert] == cut:
+                inserted_rows.append(len(offsets) - 1)
+                blob += new_words[next_insert].encode('utf-8')
+                offsets.append(len(blob))
+                counts += new_counts[next_insert]
+                masks.append(new_masks[next_insert])
+                lengths.append(new_lengths[next_insert])
+                next_insert += 1
+            if cut in removed_set:
+                remap.append(-1)
+                cursor = cut + 1
+
+        words = PackedWords(blob, offsets)
+        counts = CountRows(counts, width)
+        signature_order = array('I', [remap[row] for row in self.signature_order if remap[row] >= 0])
+
+        length_order = array('I', [remap[row] for row in self.length_order if remap[row] >= 0])
+        sizes = Counter({length: self.length_starts[length + 1] - self.length_starts[length]
+                         for length in range(len(self.length_starts) - 1)})
+        sizes.update(new_lengths)
+        sizes.subtract(old_lengths[row] for row in removed_rows)
+
+        def signature_key(row):
+            return counts[row], row
+
+        def length_key(row):
+            return lengths[row], row
+        for row in inserted_rows:
+            signature_order.insert(bisect_left(signature_order, signature_key(row), key=signature_key), row)
+            length_order.insert(bisect_left(length_order, length_key(row), key=length_key), row)
+        self.logger.info(f'{self.__class__.__name__} updated: {len(new_words):,} words added, '
+                         f'{len(removed_rows):,} removed.')
+        return WordIndex.from_columns(words, counts, masks, lengths, signature_order, length_order,
+                                      self._length_starts(sizes), logger=self.logger)
+
+    def subset(self, rows):
+        """
+        Return an index of some of the rows of this one. The columns are gathered from this index, so no word
+        is counted again.
+
+        :param rows: The rows to keep, in ascending order.
+        :return: The WordIndex of the given rows.
+        """
+        width = self.counts.width
+        old_words, old_counts, old_masks, old_lengths = self.packed_words, self.counts.buffer, self.masks, self.lengths
+        old_blob, old_offsets = old_words.blob, old_words.offsets
+        blob, offsets, counts, masks, lengths = bytearray(), array('I', [0]), bytearray(), array('I'), array('H')
+        remap = array('i', [-1]) * len(self)
+        for new_row, row in enumerate(rows):
+            blob += old_blob[old_offsets[row]:old_offsets[row + 1]]
+            offsets.append(len(blob))
+            counts += old_counts[row * width:(row + 1) * width]
+            masks.append(old_masks[row])
+            lengths.append(old_lengths[row])
+            remap[row] = new_row
+        signature_order = array('I', [remap[row] for row in self.signature_order if remap[row] >= 0])
+        self.logger.info(f'{self.__class__.__name__} subset of {len(masks):,} words taken.')
+        return WordIndex.from_columns(PackedWords(blob, offsets), CountRows(counts, width), masks, lengths,
+                                      signature_order, logger=self.logger)
+
+    @property
+    def packed_words(self) -> PackedWords:
+        """
+        :return: The words as PackedWords. Indexes are built packed; words given to from_columns as a list are
+            packed here.
+        """
+        if not isinstance(self.words, PackedWords):
+            self.words = PackedWords.from_words(self.words)
+        return self.words
+
+    @staticmethod
+    def signature(letters) -> str:
+        """
+        :param letters: A word or an iterable of letters.
+        :return: The letters lowercased and sorted, which is identical for every anagram of them.
+        """
+        return ''.join(sorted(''.join(letters).lower()))
+
+    @classmethod
+    def letter_counts(cls, letters) -> list:
+        """
+        :param letters: A word or an iterable of letters.
+        :return: How often each letter of ALPHABET appears, in ALPHABET order. Other characters are ignored.
+        """
+        counts = [0] * len(cls.ALPHABET)
+        for letter in ''.join(letters).lower():
+            slot = cls._LETTER_SLOTS.get(letter)
+            if slot is not None:
+                counts[slot] += 1
+        return counts
+
+    @classmethod
+    def letter_mask(cls, letters) -> int:
+        """
+        :param letters: A word or an iterable of letters.
+        :return: An int with the bit of every ALPHABET letter that appears set. Other characters are ignored.
+        """
+        mask = 0
+        for letter in set(''.join(letters).lower()):
+            mask |= cls._LETTER_BITS.get(letter, 0)
+        return mask
+
+    def anagrams(self, letters) -> list:
+        """
+        :param letters: A word or an iterable of letters.
+        :return: Every indexed word that uses exactly these letters, each as often as it appears.
+        """
+        counts = self.letter_counts(letters)
+        if max(counts) > 255:
+            return []
+        key = bytes(counts)
+        order, rows = self.signature_order, self.counts
+        position = bisect_left(order, key, key=rows.__getitem__)
+        found = []
+        while position < len(order) and rows[order[position]] == key:
+            row = order[position]
+            if not self.masks[row] & self.OTHER_BIT:
+                found.append(self.words[row])
+            position += 1
+        return found
+
+    def sub_anagrams(self, candidate_counts, candidate_mask: int, start_index: int = 0, end_index: int = None):
+        """
+        Yield the words in `words[start_index:end_index]` that can be built from the candidate letters,
+        using each letter no more often than it appears in the candidates.
+
+        :param candidate_counts: The letter-count vector of the candidate letters (see letter_counts).
+        :param candidate_mask: The letter presence mask of the candidate letters (see letter_mask).
+        :param start_index: The first row of the index to check.
+        :param end_index: One past the last row of the index to check. Defaults to the end of the index.
+        :return: Generator of the matching words.
+        """
+        words = self.words
+        for row in self.sub_anagram_rows(candidate_counts, candidate_mask, start_index, end_index):
+            yield words[row]
+
+    def sub_anagram_rows(self, candidate_counts, candidate_mask: int, start_index: int = 0, end_index: int = None,
+                         counters=None, rows=None):
+        """
+        Like sub_anagrams, but yield the matching row numbers instead of the words.
+
+        :param counters: Optional WorkerCounters. The rows checked and the rows rejected by the mask prefilter
+            are added to them when the generator finishes or is closed.
+        :param rows: The rows to check instead of start_index to end_index, such as some length buckets
+            (see length_rows).
+        """
+        if rows is None:
+            rows = range(start_index, len(self.words) if end_index is None else end_index)
+        reject_mask = ~candidate_mask
+        counts, masks = self.counts, self.masks
+        checked = compared = 0
+        try:
+            for checked, row in enumerate(rows, 1):
+                if masks[row] & reject_mask:
+                    continue
+                compared += 1
+                if all(map(le, counts[row], candidate_counts)):
+                    yield row
+        finally:
+            if counters is not None:
+                counters.scanned += checked
+                counters.prefilter_rejects += checked - compared
+
+    @classmethod
+    def count_blanks(cls, letters) -> int:
+        return ''.join(letters).count(cls.WILDCARD)
+
+    def wildcard_rows(self, candidate_counts, candidate_mask: int, blanks: int,
+                      start_index: int = 0, end_index: int = None, counters=None, rows=None):
+        """
+        Yield the rows in `words[start_index:end_index]` that can be built from the candidate letters
+        when `blanks` wildcards may stand in for any letter.
+
+        The blanks are a budget: a word matches if the letters it needs beyond the candidate counts add up to
+        no more than `blanks`. Each letter the candidates lack entirely costs at least one blank, so words whose
+        mask has more missing letters than there are blanks are rejected before their counts are compared.
+
+        :param candidate_counts: The letter-count vector of the candidate letters, without the wildcards.
+        :param candidate_mask: The letter presence mask of the candidate letters, without the wildcards.
+        :param blanks: The number of wildcards.
+        :param start_index: The first row of the index to check.
+        :param end_index: One past the last row of the index to check. Defaults to the end of the index.
+        :param counters: Optional WorkerCounters, updated as in sub_anagram_rows.
+        :param rows: The rows to check instead of start_index to end_index, as in sub_anagram_rows.
+        :return: Generator of the matching row numbers.
+        """
+        if rows is None:
+            rows = range(start_index, len(self.words) if end_index is None else end_index)
+        reject_mask = ~candidate_mask
+        other_bit = self.OTHER_BIT
+        counts, masks = self.counts, self.masks
+        checked = compared = 0
+        try:
+            for checked, row in enumerate(rows, 1):
+                mask = masks[row]
+                if mask & other_bit:
+                    continue
+                missing = mask & reject_mask
+                if missing and missing.bit_count() > blanks:
+                    continue
+                compared += 1
+                deficit = 0
+                for word_count, candidate_count in zip(counts[row], candidate_counts):
+                    if word_count > candidate_count:
+                        deficit += word_count - candidate_count
+                if deficit <= blanks:
+                    yield row
+        finally:
+            if counters is not None:
+                counters.scanned += checked
+                counters.prefilter_rejects += checked - compared
+
+    def blank_letters(self, word_counts, candidate_counts) -> str:
+        """
+        :param word_counts: The letter-count vector of a matching word.
+        :param candidate_counts: The letter-count vector of the candidate letters, without the wildcards.
+        :return: The letters the wildcards stand for in the word, in alphabetical order.
+        """
+        return ''.join(letter * (word_count - candidate_count)
+                       for letter, word_count, candidate_count in zip(self.ALPHABET, word_counts, candidate_counts)
+                       if word_count > candidate_count)
+
+    def walk_prefixes(self, candidate_counts, min_length: int, max_length: int = None, blanks: int = 0,
+                      counters=None, stop=None):
+        """
+        Generate the words that can be built from the candidate letters by walking the index as a trie.
+
+        The sorted words form an implicit trie: every prefix owns the contiguous range of rows that start with it,
+        and a child's range is found by bisecting inside its parent's. The walk only extends a prefix with letters
+        that are still left in the candidate multiset, so branches the remaining letters cannot extend are never
+        visited. For short candidate strings this touches a tiny fraction of the wordlist.
+
+        :param candidate_counts: The letter-count vector of the candidate letters (see letter_counts).
+        :param min_length: The shortest word length to yield.
+        :param max_length: The deepest prefix to walk, or None to walk until the letters run out.
+        :param blanks: The number of wildcards, each of which can extend a prefix with any letter.
+        :param counters: Optional WorkerCounters. The trie nodes visited are added to their scanned count when the
+            generator finishes or is closed.
+        :param stop: Called with no arguments at every trie node. Once it returns True, the walk ends early, so a
+            walk that finds few words can still be stopped promptly.
+        :return: Generator of the matching words, in alphabetical order.
+        """
+        words, alphabet = self.words, self.ALPHABET
+        remaining = list(candidate_counts)
+        blanks_left = blanks
+        visited = 0
+        total_letters = sum(remaining) + blanks
+        max_length = min(max_length or total_letters, total_letters)
+
+        def walk(prefix, start_index, end_index):
+            nonlocal blanks_left, visited
+            visited += 1
+            if stop is not None and stop():
+                return
+            if len(prefix) >= min_length and words[start_index] == prefix:
+                yield prefix
+            if len(prefix) >= max_length:
+                return
+            for slot, letter in enumerate(alphabet):
+                if remaining[slot]:
+                    use_blank = False
+                elif blanks_left:
+                    use_blank = True
+                else:
+                    continue
+                child = prefix + letter
+                child_start = bisect_left(words, child, start_index, end_index)
+                if child_start == end_index or not words[child_start].startswith(child):
+                    continue
+                # every word starting with `child` sorts before `prefix` followed by the next letter
+                child_end = bisect_left(words, prefix + chr(ord(letter) + 1), child_start, end_index)
+                if use_blank:
+                    blanks_left -= 1
+                    yield from walk(child, child_start, child_end)
+                    blanks_left += 1
+                else:
+                    remaining[slot] -= 1
+                    yield from walk(child, child_start, child_end)
+                    remaining[slot] += 1
+
+        try:
+            if len(words):
+                yield from walk('', 0, len(words))
+        finally:
+            if counters is not None:
+                counters.scanned += visited
+
+
+class WordIndexBuilder:
+    """
+    Collects the words of a WordIndex as they arrive, so a wordlist can be indexed straight from a stream.
+
+    Each word is lowercased and deduplicated as it is added, so reading a file through a WordlistReader never
+    holds its lines in a list or the words in a second set. The columns are computed once, in sorted word order,
+    when `columns` is called; computing them as the words arrive would cost a second pass to reorder them.
+
+    Methods:
+        add(word): Add one word.
+        update(words): Add every word of an iterable.
+        columns(): Return the sorted words and their columns, as WordIndex.from_columns takes them.
+        build(): Return a WordIndex of the words added so far.
+    """
+    def __init__(self, words=()):
+        self._words = set()
+        self.update(words)
+
+    def __len__(self):
+        return len(self._words)
+
+    def add(self, word: str):
+        self._words.add(word if word.islower() else word.lower())
+
+    def update(self, words):
+        # words that are already lowercase are kept as they are, so they are shared with the caller, not copied
+        self._words.update(word if word.islower() else word.lower() for word in words)
+
+    def columns(self) -> tuple:
+        """
+        :return: (words, counts, masks, lengths, signature_order) with the words sorted and packed (see PackedWords)
+            and the columns in word order.
+        """
+        blob = bytearray()
+        offsets = array('I', [0])
+        counts = bytearray()
+        masks = array('I')
+        lengths = array('H')
+        alphabet, letter_bits, other_bit = WordIndex.ALPHABET, WordIndex._LETTER_BITS, WordIndex.OTHER_BIT
+        for word in sorted(self._words):
+            blob += word.encode('utf-8')
+            offsets.append(len(blob))
+            word_counts = list(map(word.count, alphabet))
+            mask = 0
+            for letter in set(word):
+                mask |= letter_bits.get(letter, other_bit)
+            if max(word_counts) > 255:
+                mask |= other_bit
+                word_counts = [min(count, 255) for count in word_counts]
+            counts += bytes(word_counts)
+            masks.append(mask)
+            lengths.append(min(len(word), 0xFFFF))
+        counts = CountRows(counts, len(alphabet))
+        signature_order = array('I', sorted(range(len(masks)), key=counts.__getitem__))
+        return PackedWords(blob, offsets), counts, masks, lengths, signature_order
+
+    def build(self, **kwargs) -> WordIndex:
+        return WordIndex.from_columns(*self.columns(), **kwargs)
+
+
+class WordlistView(Set):
+    """
+    A read-only set of words backed by a WordIndex, which serves as the store of the words.
+
+    A view holds either every word of the store or a sorted array of its rows, so wordlists that are subsets of one
+    another, such as the NLTK basic and full wordlists, share one copy of their words instead of one set each.
+    Membership is a binary search of the store. Set operations such as | and - return plain sets.
+
+    Attributes:
+        store (WordIndex): The index holding the words.
+        rows (array or None): The rows of the store in the view, in ascending order, or None for all of them.
+
+    Methods:
+        index(): Return the WordIndex of the words in the view.
+    """
+    def __init__(self, store: WordIndex, rows=None):
+        self.store = store
+        self.rows = rows
+        self._index = store if rows is None else None
+
+    @classmethod
+    def _from_iterable(cls, iterable):
+        return set(iterable)
+
+    def __len__(self):
+        return len(self.store) if self.rows is None else len(self.rows)
+
+    def __iter__(self):
+        if self.rows is None:
+            yield from self.store.words
+        else:
+            words = self.store.words
+            for row in self.rows:
+                yield words[row]
+
+    def __contains__(self, word):
+        if not isinstance(word, str):
+            return False
+        row = self.store.row_of(word)
+        if row is None or self.rows is None:
+            return row is not None
+        position = bisect_left(self.rows, row)
+        return position < len(self.rows) and self.rows[position] == row
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({len(self):,} of {len(self.store):,} words)'
+
+    def index(self) -> WordIndex:
+        """
+        :return: The store itself when the view holds all of it, otherwise a WordIndex of the view's rows,
+            taken on first use.
+        """
+        if self._index is None:
+            self._index = self.store.subset(self.rows)
+        return self._index
+
+
+class PositionalIndex:
+    """
+    Posting lists of the rows of a WordIndex by word length, position and letter, for pattern queries such as
+    'c_t' or '??ing', where some positions hold a fixed letter and the others are open.
+
+    A query intersects the posting lists of its fixed letters, so it only ever touches the words of the pattern's
+    length that have those letters in those places, instead of matching the pattern against the whole wordlist.
+    Words with characters outside WordIndex.ALPHABET are not indexed.
+
+    Attributes:
+        OPEN_POSITIONS (str): The pattern characters that mark an open position.
+        index (WordIndex): The indexed words.
+        postings (dict): For each (length, position, letter), the rows of the words of that length with that letter
+            at that position, in ascending order.
+
+    Methods:
+        parse(pattern): Return the fixed (position, letter) pairs of a pattern.
+        fixed_letters(pattern): Return the fixed letters of a pattern.
+        rows(pattern): Return the rows of the words that fit a pattern's fixed letters, in ascending order.
+    """
+    OPEN_POSITIONS = '_?.'
+
+    def __init__(self, index: WordIndex, **kwargs):
+        self.logger = kwargs.get('logger', getLogger('dummy_logger'))
+        self.index = index
+        postings = {}
+        masks, other_bit = index.masks, index.OTHER_BIT
+        for row, word in enumerate(index.words):
+            if masks[row] & other_bit:
+                continue
+            length = len(word)
+            for position, letter in enumerate(word):
+                key = (length, position, letter)
+                rows = postings.get(key)
+                if rows is None:
+                    rows = postings[key] = array('I')
+                rows.append(row)
+        self.postings = postings
+        self.logger.info(f'{self.__class__.__name__} built with {len(postings):,} posting lists.')
+
+    @classmethod
+    def parse(cls, pattern: str) -> list:
+        """
+        :param pattern: Letters for the fixed positions and any of OPEN_POSITIONS for the open ones.
+        :return: The (position, letter) pairs of the fixed positions, with the letters lowercased.
+        """
+        fixed = []
+        for position, character in enumerate(pattern.lower()):
+            if character in cls.OPEN_POSITIONS:
+                continue
+            if character not in WordIndex.ALPHABET:
+                raise ValueError(f"invalid pattern character '{character}', use letters and "
+                                 f"{', '.join(repr(c) for c in cls.OPEN_POSITIONS)} for open positions.")
+            fixed.append((position, character))
+        return fixed
+
+    @classmethod
+    def fixed_letters(cls, pattern: str) -> str:
+        return ''.join(letter for _, letter in cls.parse(pattern))
+
+    def rows(self, pattern: str):
+        """
+        :param pattern: See parse.
+        :return: The rows of the words as long as the pattern with its fixed letters in place, in ascending order.
+            Open positions are not checked, so every word of the pattern's length fits a pattern without fixed
+            letters.
+        """
+        length, fixed = len(pattern), self.parse(pattern)
+        if not fixed:
+            masks, other_bit = self.index.masks, self.index.OTHER_BIT
+            return array('I', sorted(row for row in self.index.length_rows(length, length)
+                                     if not masks[row] & other_bit))
+        postings = sorted((self.postings.get((length, position, letter), ()) for position, letter in fixed), key=len)
+        rows = postings[0]
+        for other in postings[1:]:
+            if not rows:
+                break
+            rows = self._intersect(rows, other)
+        return rows
+
+    @staticmethod
+    def _intersect(rows, other) -> array:
+        """
+        :return: The rows in both ascending sequences. Each row of the shorter one is looked up in the longer one
+            with a binary search that starts where the last one ended.
+        """
+        found = array('I')
+        low, end = 0, len(other)
+        for row in rows:
+            low = bisect_left(other, row, low)
+            if low == end:
+                break
+            if other[low] == row:
+                found.append(row)
+        return found
@@ -0,0 +1,214 @@
+import json
+import mmap
+import sys
+from array import array
+from hashlib import sha1
+from logging import getLogger
+from os import replace
+from pathlib import Path
+from tempfile import mkstemp
+
+from WordIndex import WordIndex, CountRows, PackedWords
+
+
+class WordlistCache:
+    """
+    A directory of compiled wordlists that can be opened with mmap instead of being parsed again.
+
+    A compiled wordlist holds the deduplicated, lowercased words of a source together with every WordIndex column
+    (letter counts, masks, lengths and the signature order). Opening one maps the file read-only and hands the
+    columns to WordIndex.from_columns, so a cold start only reads the pages a search actually touches.
+
+    Each entry is keyed by a description of its source, for example a file path with its modification time
+    and size. A different key maps to a different file, so editing the source invalidates the old entry.
+
+    File layout:
+        MAGIC, a little-endian uint32 header length, the JSON header, then the sections listed in the header.
+        Every section starts on an 8 byte boundary.
+
+    Attributes:
+        MAGIC (bytes): The first bytes of every compiled wordlist.
+        FORMAT_VERSION (int): Bumped whenever the layout changes, which invalidates older files.
+        SUFFIX (str): The file suffix of compiled wordlists.
+        VERSION_FIELDS (tuple): The source key fields that change when the source changes. Entries whose keys only
+            differ in these are versions of one source, and saving one deletes the others.
+        cache_dir (Path): Where compiled wordlists are stored.
+
+    Methods:
+        source_stamp(path): Describe a source file by its resolved path, modification time and size.
+        cache_file(key): Return the compiled wordlist path for a source key.
+        load(key, build_index): Open the compiled wordlist for a key, compiling it first if needed.
+        save(index, key): Write an index to the cache under a key, deleting older versions of the same source.
+        prune(key): Delete the entries of older versions of a source.
+    """
+    MAGIC = b'WDX1'
+    FORMAT_VERSION = 2
+    SUFFIX = '.wdx'
+    VERSION_FIELDS = ('mtime_ns', 'size', 'nltk_version')
+    _ALIGNMENT = 8
+
+    def __init__(self, cache_dir: Path or str, **kwargs):
+        self.logger = kwargs.get('logger', getLogger('dummy_logger'))
+        self.cache_dir = Path(cache_dir)
+
+    @staticmethod
+    def source_stamp(path: Path or str) -> dict:
+        """
+        :param path: A wordlist source file.
+        :return: The resolved path, modification time and size of the file, or only the path if it cannot be read.
+        """
+        path = Path(str(path))
+        try:
+            stat = path.stat()
+        except OSError:
+            return {'path': str(path)}
+        return {'path': str(path.resolve()), 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+    def cache_file(self, key: dict) -> Path:
+        digest = sha1(json.dumps(key, sort_keys=True).encode('utf-8')).hexdigest()
+        return self.cache_dir / f'{digest[:24]}{self.SUFFIX}'
+
+    def load(self, key: dict, build_index) -> WordIndex:
+        """
+        :param key: A JSON serializable description of the wordlist source.
+        :param build_index: Called without arguments to produce the WordIndex when the cache has no valid entry.
+        :return: The WordIndex for the source, memory-mapped from the cache.
+        """
+        cache_file = self.cache_file(key)
+        index = self._open(cache_file, key)
+        if index is None:
+            self.logger.info(f'compiling wordlist into {cache_file}')
+            self.save(build_index(), key)
+            index = self._open(cache_file, key)
+        return index
+
+    def save(self, index: WordIndex, key: dict):
+        """
+        Write an index to the cache. The file is written to a temporary file of its own in cache_dir and then moved
+        into place, so readers never see a partial file and processes compiling the same source at once do not
+        write over each other. If moving it fails but another process's copy is in place, that copy is kept.
+
+        :param index: The index to compile.
+        :param key: The source key it is stored under.
+        :return: None
+        """
+        words = index.packed_words
+        sections = {'masks': array('I', index.masks).tobytes(),
+                    'lengths': array('H', index.lengths).tobytes(),
+                    'counts': bytes(index.counts.buffer),
+                    'signature_order': array('I', index.signature_order).tobytes(),
+                    'length_order': array('I', index.length_order).tobytes(),
+                    'length_starts': array('I', index.length_starts).tobytes(),
+                    'word_offsets': array('I', words.offsets).tobytes(),
+                    'words': bytes(words.blob)}
+        header = {'format_version': self.FORMAT_VERSION, 'byteorder': sys.byteorder, 'key': key,
+                  'size': len(index), 'sections': {}}
+        # the section offsets depend on the header length, so grow the space reserved for it until it fits
+        header_space = self._aligned(len(self.MAGIC) + 4 + len(json.dumps(header)))
+        while True:
+            position = header_space
+            for name, data in sections.items():
+                header['sections'][name] = [position, len(data)]
+                position = self._aligned(position + len(data))
+            header_bytes = json.dumps(header).encode('utf-8')
+            if len(self.MAGIC) + 4 + len(header_bytes) <= header_space:
+                break
+            header_space = self._aligned(len(self.MAGIC) + 4 + len(header_bytes))
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        cache_file = self.cache_file(key)
+        descriptor, partial_name = mkstemp(dir=self.cache_dir, prefix=f'{cache_file.stem}.', suffix='.partial')
+        partial_file = Path(partial_name)
+        try:
+            with open(descriptor, 'wb') as f:
+                f.write(self.MAGIC)
+                f.write(len(header_bytes).to_bytes(4, 'little'))
+                f.write(header_bytes)
+                for name, data in sections.items():
+                    f.seek(header['sections'][name][0])
+                    f.write(data)
+            replace(partial_file, cache_file)
+        except OSError:
+            partial_file.unlink(missing_ok=True)
+            if not cache_file.is_file():
+                raise
+            # another process compiled the same source at the same time, and its copy is just as good
+            self.logger.info(f'{cache_file} was compiled by another process, keeping that copy.')
+            return
+        self.logger.info(f'{len(index):,} words compiled into {cache_file}')
+        self.prune(key)
+
+    def prune(self, key: dict) -> int:
+        """
+        Delete the compiled wordlists of older versions of a source: those whose keys only differ from this one in
+        VERSION_FIELDS, such as the same file before it was edited. Without this, every edit of a wordlist would
+        leave another full compiled copy behind.
+
+        :param key: The source key of the version to keep.
+        :return: The number of files deleted.
+        """
+        source = self._source_identity(key)
+        keep = self.cache_file(key)
+        deleted = 0
+        for cache_file in self.cache_dir.glob(f'*{self.SUFFIX}'):
+            if cache_file == keep:
+                continue
+            try:
+                other_key = self._read_header(cache_file).get('key')
+            except (OSError, ValueError):
+                continue
+            if not isinstance(other_key, dict) or self._source_identity(other_key) != source:
+                continue
+            try:
+                cache_file.unlink()
+                deleted += 1
+            except OSError as e:
+                # another process may still have it mapped, on platforms that do not allow deleting that
+                self.logger.warning(f'could not delete the outdated compiled wordlist {cache_file}: {e}')
+        if deleted:
+            self.logger.info(f'{deleted} outdated compiled wordlist(s) deleted.')
+        return deleted
+
+    @classmethod
+    def _source_identity(cls, key: dict) -> dict:
+        return {field: value for field, value in key.items() if field not in cls.VERSION_FIELDS}
+
+    def _read_header(self, cache_file: Path) -> dict:
+        with cache_file.open('rb') as f:
+            if f.read(len(self.MAGIC)) != self.MAGIC:
+                raise ValueError('bad magic number')
+            header_length = int.from_bytes(f.read(4), 'little')
+            return json.loads(f.read(header_length))
+
+    def _open(self, cache_file: Path, key: dict) -> WordIndex or None:
+        """
+        :return: The memory-mapped index, or None if the file is missing, stale or unreadable.
+        """
+        if not cache_file.is_file():
+            return None
+        try:
+            with cache_file.open('rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if mapped[:len(self.MAGIC)] != self.MAGIC:
+                raise ValueError('bad magic number')
+            header_start = len(self.MAGIC) + 4
+            header_length = int.from_bytes(mapped[len(self.MAGIC):header_start], 'little')
+            header = json.loads(mapped[header_start:header_start + header_length])
+        except (OSError, ValueError) as e:
+            self.logger.warning(f'ignoring unreadable compiled wordlist {cache_file}: {e}')
+            return None
+        if (header.get('format_version') != self.FORMAT_VERSION or header.get('byteorder') != sys.byteorder
+                or header.get('key') != key):
+            self.logger.info(f'compiled wordlist {cache_file} is stale.')
+            return None
+
+        view = memoryview(mapped)
+        sections = {name: view[start:start + length] for name, (start, length) in header['sections'].items()}
+        words = PackedWords(sections['words'], sections['word_offsets'].cast('I'))
+        return WordIndex.from_columns(words, CountRows(sections['counts'], len(WordIndex.ALPHABET)),
+                                      sections['masks'].cast('I'), sections['lengths'].cast('H'),
+                                      sections['signature_order'].cast('I'), sections['length_order'].cast('I'),
+                                      sections['length_starts'].cast('I'), logger=self.logger)
+
+    def _aligned(self, position: int) -> int:
+        return -(-position // self._ALIGNMENT) * self._ALIGNMENT
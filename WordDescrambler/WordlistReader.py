@@ -0,0 +1,84 @@
+import io
+from logging import getLogger
+from pathlib import Path
+
+
+class WordlistReader:
+    """
+    Streams the words of a wordlist file one at a time, so a large file never has to be held in memory as a whole.
+
+    The file is read line by line through a large buffer. Files ending in .gz, .bz2 or .xz are decompressed
+    on the fly. Each line is stripped and lowercased, and lines that could never match a search are dropped while
+    reading: empty lines, words with non-alphabetic characters and words longer than max_word_length.
+
+    A reader can be iterated more than once. Every pass reopens the file, so it can be handed straight to
+    WordIndex, which then indexes the words as they are read.
+
+    Attributes:
+        BUFFER_SIZE (int): The read buffer size in bytes.
+        COMPRESSED_SUFFIXES (tuple): The file suffixes that are decompressed while reading.
+        path (Path): The wordlist file.
+        max_word_length (int or None): Longer words are dropped. None keeps every length.
+        alphabetic_only (bool): Drop words containing characters that are not letters.
+        encoding (str): The text encoding of the file.
+        words_read (int): The non-empty lines seen by the last pass.
+        words_dropped (int): The words the last pass dropped.
+
+    Methods:
+        open(): Open the file as a text stream, decompressing it if needed.
+        read_set(): Read every kept word into a set.
+    """
+    BUFFER_SIZE = 1 << 20
+    COMPRESSED_SUFFIXES = ('.gz', '.bz2', '.xz')
+
+    def __init__(self, path: Path or str, max_word_length: int = None, alphabetic_only: bool = True, **kwargs):
+        self.logger = kwargs.get('logger', getLogger('dummy_logger'))
+        self.path = Path(path)
+        self.max_word_length = max_word_length
+        self.alphabetic_only = alphabetic_only
+        self.encoding = kwargs.get('encoding', 'utf-8')
+        self.words_read = 0
+        self.words_dropped = 0
+
+    def open(self) -> io.TextIOBase:
+        """
+        :return: The file as a buffered text stream. Compressed files are decompressed as they are read.
+        """
+        suffix = self.path.suffix.lower()
+        if suffix == '.gz':
+            import gzip
+            raw = gzip.open(self.path, 'rb')
+        elif suffix == '.bz2':
+            import bz2
+            raw = bz2.open(self.path, 'rb')
+        elif suffix == '.xz':
+            import lzma
+            raw = lzma.open(self.path, 'rb')
+        else:
+            return self.path.open('r', encoding=self.encoding, errors='replace', buffering=self.BUFFER_SIZE)
+        return io.TextIOWrapper(io.BufferedReader(raw, buffer_size=self.BUFFER_SIZE),
+                                encoding=self.encoding, errors='replace')
+
+    def __iter__(self):
+        max_word_length, alphabetic_only = self.max_word_length, self.alphabetic_only
+        read = dropped = 0
+        try:
+            with self.open() as file:
+                for line in file:
+                    word = line.strip().lower()
+                    if not word:
+                        continue
+                    read += 1
+                    if (alphabetic_only and not word.isalpha()) or (max_word_length and len(word) > max_word_length):
+                        dropped += 1
+                        continue
+                    yield word
+        finally:
+            self.words_read, self.words_dropped = read, dropped
+            self.logger.info(f'{read:,} words read from {self.path}, {dropped:,} dropped.')
+
+    def read_set(self) -> set:
+        """
+        :return: The kept words, deduplicated.
+        """
+        return set(self)
@@ -0,0 +1,173 @@
+import json
+import threading
+import weakref
+from collections import OrderedDict
+from logging import getLogger
+
+
+class _Entry:
+    __slots__ = ('index', 'leases', 'derived', 'build_lock')
+
+    def __init__(self):
+        self.index = None
+        self.leases = 0
+        self.derived = {}
+        # reentrant, because building the full NLTK index borrows the corpus store under the same key
+        self.build_lock = threading.RLock()
+
+
+class WordlistRegistry:
+    """
+    A thread-safe registry of loaded wordlist indexes, shared by every WordDescramblerCore in the process, so that
+    instances using the same wordlist borrow one index instead of each building their own.
+
+    Entries are keyed by a description of their source, the same keys WordlistCache uses: the NLTK corpus and its
+    version, or a file's resolved path with its modification time and size. Editing a file changes its key, so the
+    next borrower loads the new version while the current borrowers keep the old one.
+
+    Every borrow is a lease, and an entry counts its leases. When the last one is released, the entry is not freed
+    straight away but kept among the idle entries, so a stream of short-lived instances does not rebuild the index
+    every time. Once there are more than max_idle idle entries, the oldest ones are freed. A lease is released by
+    calling it, or when the object that holds it is garbage collected.
+
+    Only one thread builds an entry. Threads that borrow it in the meantime wait for that build instead of starting
+    their own. Structures derived from an index, such as the arrays of the numpy backend, can be kept in its entry
+    too (see derived), and are freed with it.
+
+    Attributes:
+        MAX_IDLE (int): The number of idle entries kept unless another is given.
+        max_idle (int): The number of idle entries kept for later borrowers. 0 frees an entry with its last lease.
+        builds (int): The entries built so far.
+        hits (int): The borrows served by an entry that was already built.
+
+    Methods:
+        shared(): Return the registry of the process.
+        acquire(key, build, owner): Borrow the index for a source key, building it first if needed.
+        acquire_existing(key, owner): Borrow the index for a source key only if it is already built.
+        derived(index, name, build): Return a structure derived from a registered index, built once per entry.
+        release_idle(): Free every idle entry.
+        stats(): Return the entry, lease, build and hit counts.
+    """
+    MAX_IDLE = 2
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_idle: int = None, **kwargs):
+        self.logger = kwargs.get('logger', getLogger('dummy_logger'))
+        self.max_idle = self.MAX_IDLE if max_idle is None else max_idle
+        self.builds = 0
+        self.hits = 0
+        self._lock = threading.Lock()
+        self._entries = {}
+        # the entries without leases, least recently released first
+        self._idle = OrderedDict()
+
+    @classmethod
+    def shared(cls):
+        """
+        :return: The registry of the process, created on first use.
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def acquire(self, key: dict, build, owner) -> tuple:
+        """
+        :param key: A description of the wordlist source (see WordlistCache.source_stamp).
+        :param build: Called with no arguments to load the index when the registry does not have it yet.
+        :param owner: The object the lease belongs to. The lease is released when it is garbage collected.
+        :return: (index, lease). Calling the lease releases it; later calls do nothing.
+        """
+        name = json.dumps(key, sort_keys=True)
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                entry = self._entries[name] = _Entry()
+            self._idle.pop(name, None)
+            entry.leases += 1
+        try:
+            with entry.build_lock:
+                if entry.index is None:
+                    index = build()
+                    # a nested borrow of the same key may have registered the index already
+                    if entry.index is None:
+                        entry.index = index
+                        with self._lock:
+                            self.builds += 1
+                        self.logger.info(f'wordlist index registered for {name}.')
+                else:
+                    with self._lock:
+                        self.hits += 1
+        except BaseException:
+            self._release(name)
+            raise
+        return entry.index, weakref.finalize(owner, self._release, name)
+
+    def acquire_existing(self, key: dict, owner) -> tuple or None:
+        """
+        :return: (index, lease) as acquire returns them, or None if the registry has not built the index for the key,
+            in which case nothing is borrowed or built.
+        """
+        name = json.dumps(key, sort_keys=True)
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or entry.index is None:
+                return None
+            self._idle.pop(name, None)
+            entry.leases += 1
+            self.hits += 1
+        return entry.index, weakref.finalize(owner, self._release, name)
+
+    def _release(self, name: str):
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return
+            entry.leases -= 1
+            if entry.leases > 0:
+                return
+            if entry.index is None:
+                # the build failed, so there is nothing worth keeping
+                del self._entries[name]
+                return
+            self._idle[name] = entry
+            while len(self._idle) > self.max_idle:
+                self._free(self._idle.popitem(last=False)[0])
+
+    def _free(self, name: str):
+        del self._entries[name]
+        self.logger.info(f'wordlist index freed for {name}.')
+
+    def derived(self, index, name: str, build):
+        """
+        :param index: An index, usually one borrowed from the registry.
+        :param name: What the structure is, such as the name of the search backend it is for.
+        :param build: Called with no arguments to build the structure the first time.
+        :return: The structure kept in the index's entry, or a new one when the index is not registered,
+            such as an index updated with add_words.
+        """
+        with self._lock:
+            entry = next((entry for entry in self._entries.values() if entry.index is index), None)
+        if entry is None:
+            return build()
+        with entry.build_lock:
+            if name not in entry.derived:
+                entry.derived[name] = build()
+            return entry.derived[name]
+
+    def release_idle(self) -> int:
+        """
+        :return: The number of idle entries freed.
+        """
+        with self._lock:
+            freed = len(self._idle)
+            while self._idle:
+                self._free(self._idle.popitem(last=False)[0])
+        return freed
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'idle': len(self._idle),
+                    'leases': sum(entry.leases for entry in self._entries.values()),
+                    'builds': self.builds, 'hits': self.hits}
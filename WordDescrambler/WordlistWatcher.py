@@ -0,0 +1,63 @@
+import threading
+from logging import getLogger
+from pathlib import Path
+
+from WordlistCache import WordlistCache
+
+
+class WordlistWatcher:
+    """
+    Polls a wordlist file on a background thread and calls back when it changes.
+
+    A change is a new modification time or size, as reported by WordlistCache.source_stamp. Polling, rather than
+    OS file events, keeps the watcher dependency free and works on network drives. The check costs one stat() call.
+
+    Attributes:
+        path (Path): The watched file.
+        interval (float): Seconds between checks.
+        on_change (callable): Called with no arguments from the watcher thread when the file changes.
+        stamp (dict): The source stamp seen at the last check.
+
+    Methods:
+        start(): Start polling on a daemon thread.
+        check(): Check once, calling on_change if the file changed. Returns True if it did.
+        stop(): Stop polling and wait for the thread to finish.
+    """
+    def __init__(self, path: Path or str, on_change, interval: float = 1.0, **kwargs):
+        self.logger = kwargs.get('logger', getLogger('dummy_logger'))
+        self.path = Path(path)
+        self.interval = interval
+        self.on_change = on_change
+        self.stamp = WordlistCache.source_stamp(self.path)
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._poll, name=f'{self.__class__.__name__}-{self.path.name}',
+                                            daemon=True)
+            self._thread.start()
+            self.logger.info(f'watching {self.path} every {self.interval} seconds.')
+
+    def check(self) -> bool:
+        stamp = WordlistCache.source_stamp(self.path)
+        if stamp == self.stamp:
+            return False
+        self.stamp = stamp
+        self.logger.info(f'{self.path} changed.')
+        self.on_change()
+        return True
+
+    def _poll(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                # a half-written file or a failed update must not kill the watcher; the next change retries
+                self.logger.error(f'applying the changes to {self.path} failed: {e}')
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
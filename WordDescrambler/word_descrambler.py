@@ -0,0 +1,279 @@
+"""
+The headless command line entry point.
+
+Example usage:
+```
+python word_descrambler.py --letters "example"
+python word_descrambler.py --letters "example" --json
+python word_descrambler.py --letters "examp?e" --top-k 10 --scorer tiles
+python word_descrambler.py --letters "AndrewJamesMcSparron" --phrases --max-words 3
+python word_descrambler.py --pattern "??ing" --letters "rtsa"
+python word_descrambler.py --pattern "c_t"
+python word_descrambler.py --batch candidates.txt --workers 4 --processes > matches.jsonl
+cat candidates.txt | python word_descrambler.py --batch - --use-all-letters
+```
+"""
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import partial
+from itertools import islice
+
+import click
+
+from Scoring import SCORERS
+from WordDescramblerCore import WordDescramblerCore
+
+
+# the options shared with the server (see DescramblerServer), so both entry points parse them the same way
+wordlist_option = click.option('--wordlist', type=click.Path(exists=True, dir_okay=False),
+                               help='Path to the wordlist file. Defaults to the config.')
+config_option = click.option('--config', default=WordDescramblerCore.DEFAULT_CONFIG_PATH, show_default=True,
+                             help='Path to the config file.')
+backend_option = click.option('--backend', type=click.Choice(WordDescramblerCore.SEARCH_BACKENDS),
+                              help='Search backend. Defaults to the config.')
+
+
+def core_options(wordlist: str or None, config: str, backend: str or None = None,
+                 frequency_path: str or None = None) -> dict:
+    """
+    :return: The WordDescramblerCore keyword arguments for the shared options. The ones not given come from
+        the config.
+    """
+    core_kwargs = {'path_to_wordlist': wordlist, 'config_full_file_location': config}
+    if backend is not None:
+        core_kwargs['search_backend'] = backend
+    if frequency_path is not None:
+        core_kwargs['frequency_path'] = frequency_path
+    return core_kwargs
+
+
+def search_options(use_all_letters: bool or None, min_match_length: int or None, limit_length: int or None,
+                   top_k: int or None = None, scorer: str or None = None) -> dict:
+    """
+    :return: The search keyword arguments for the options that were given; the others come from the config.
+        With top_k, they are top_matches arguments instead of search_many ones.
+    """
+    options = {'use_all_letters': use_all_letters, 'min_match_length': min_match_length,
+               'limit_length': limit_length, 'top_k': top_k, 'scorer': scorer}
+    return {name: value for name, value in options.items() if value is not None}
+
+
+def find_matches(core: WordDescramblerCore, candidates: list, options: dict) -> dict:
+    """
+    :return: A dict of each candidate string to its sorted matches, or to its (word, score) pairs, best first,
+        when options has a top_k.
+    """
+    if 'top_k' in options:
+        return {letters: core.top_matches(letters, **options) for letters in candidates}
+    return {letters: sorted(matches) for letters, matches in core.search_many(candidates, **options).items()}
+
+
+def match_result(matches: list, ranked: bool) -> dict:
+    if ranked:
+        return {'matches': [word for word, _ in matches], 'scores': [score for _, score in matches],
+                'count': len(matches)}
+    return {'matches': matches, 'count': len(matches)}
+
+
+def read_candidates(lines):
+    """
+    :param lines: An iterable of lines, such as an open file or stdin.
+    :return: Generator of (line number, candidate string) pairs, skipping blank lines.
+    """
+    for line_number, line in enumerate(lines, 1):
+        letters = line.strip()
+        if letters:
+            yield line_number, letters
+
+
+def search_chunk(core: WordDescramblerCore, chunk: list, options: dict) -> list:
+    """
+    :param chunk: A list of (line number, candidate string) pairs.
+    :return: One result dict per candidate, in chunk order (see run_batch). The queries of a chunk are searched
+        together, so 'mean_seconds' is the chunk's search time divided by its queries, not each query's own time.
+    """
+    results = []
+    valid = []
+    for line_number, letters in chunk:
+        if len(letters) > core.MAX_CANDIDATE_LENGTH:
+            results.append({'line': line_number, 'letters': letters,
+                            'error': f'Too many candidate letters. Max characters supported is '
+                                     f'{core.MAX_CANDIDATE_LENGTH}'})
+        else:
+            valid.append((line_number, letters))
+    start = time.perf_counter()
+    found = find_matches(core, [letters for _, letters in valid], options)
+    mean_seconds = (time.perf_counter() - start) / max(len(valid), 1)
+    for line_number, letters in valid:
+        results.append({'line': line_number, 'letters': letters, **match_result(found[letters], 'top_k' in options),
+                        'mean_seconds': mean_seconds})
+    return results
+
+
+# the descrambler of a batch worker process, inherited from the parent when workers are forked
+_worker_core = None
+
+
+def _init_worker(core_kwargs: dict):
+    global _worker_core
+    if _worker_core is None:
+        _worker_core = WordDescramblerCore(**core_kwargs)
+
+
+def _search_chunk_in_worker(chunk: list, options: dict) -> list:
+    return search_chunk(_worker_core, chunk, options)
+
+
+def run_batch(core: WordDescramblerCore, candidates, options: dict, workers: int = 1, chunk_size: int = 32,
+              core_kwargs: dict = None):
+    """
+    Search a stream of candidate strings against one loaded index and yield a result for each one as it completes.
+
+    Candidates are read lazily and searched in chunks of chunk_size with search_many, so each chunk benefits from
+    its grouping and from the result cache. Up to `workers` chunks are searched at once and no more than twice that
+    many are read ahead, so memory stays flat however long the input is.
+
+    Workers are threads sharing the index unless core_kwargs is given, in which case they are processes. Forked
+    processes inherit the loaded index; where processes are spawned instead, each worker opens the index again
+    from core_kwargs, which is cheap when the wordlist cache is enabled. Worker processes share the on-disk tier of
+    the result cache with the parent, each through a connection of its own (see ResultCache).
+
+    :param core: The descrambler holding the index.
+    :param candidates: An iterable of (line number, candidate string) pairs.
+    :param options: The search keyword arguments (see search_options).
+    :param workers: The number of chunks searched at once.
+    :param chunk_size: The number of candidates per search_many call.
+    :param core_kwargs: The WordDescramblerCore arguments for worker processes, or None to use threads.
+    :return: Generator of result dicts with 'line', 'letters' and either 'matches', 'count' and 'mean_seconds',
+        or 'error'. Results come in completion order, not input order; 'line' ties each one back to its input.
+    """
+    global _worker_core
+    candidates = iter(candidates)
+    if core_kwargs is None:
+        executor = ThreadPoolExecutor(max_workers=workers)
+        submit = partial(executor.submit, search_chunk, core)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import get_all_start_methods, get_context
+        _worker_core = core
+        # build the index before forking so every worker inherits it instead of building its own
+        core.index
+        start_method = 'fork' if 'fork' in get_all_start_methods() else None
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=get_context(start_method),
+                                       initializer=_init_worker, initargs=(core_kwargs,))
+        submit = partial(executor.submit, _search_chunk_in_worker)
+
+    with executor:
+        pending = set()
+        while True:
+            while len(pending) < workers * 2:
+                chunk = list(islice(candidates, chunk_size))
+                if not chunk:
+                    break
+                pending.add(submit(chunk, options))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+
+@click.command(context_settings={'help_option_names': ['-h', '--help']})
+@click.option('--letters', '-l', help='Candidate letters for a single query. Use ? for a blank.')
+@click.option('--batch', '-b', type=click.File('r'),
+              help='Read candidate strings from this file, one per line, and write one JSON line per query. '
+                   'Use - for stdin.')
+@click.option('--use-all-letters/--any-letters', default=None,
+              help='Only return words that use every candidate letter. Defaults to the config.')
+@click.option('--min-match-length', type=click.IntRange(min=0), help='Shortest word to return.')
+@click.option('--limit-length', type=click.IntRange(min=0), help='Longest word to return, 0 for no limit.')
+@click.option('--top-k', type=click.IntRange(min=1),
+              help='Only return the best TOP_K matches, best first, ranked by --scorer.')
+@click.option('--scorer', type=click.Choice(list(SCORERS)), help='How --top-k ranks matches. Defaults to the config.')
+@click.option('--frequency-path', type=click.Path(exists=True, dir_okay=False),
+              help="Word count file of the 'frequency' scorer.")
+@click.option('--pattern', '-p',
+              help='Only match words that fit this pattern, such as "c_t" or "??ing". Open positions (_ ? .) are '
+                   'filled from --letters, or from any letter without --letters.')
+@click.option('--phrases', is_flag=True,
+              help='Find multi-word phrases that use every letter instead of single words. Works with --letters.')
+@click.option('--max-words', type=click.IntRange(min=0), help='Most words in a phrase, 0 for no limit.')
+@click.option('--min-word-length', type=click.IntRange(min=1), help='Shortest word in a phrase.')
+@click.option('--max-results', type=click.IntRange(min=1), help='Stop after this many phrases.')
+@backend_option
+@wordlist_option
+@config_option
+@click.option('--workers', '-w', type=click.IntRange(min=1), default=1, show_default=True,
+              help='Batch chunks searched at once.')
+@click.option('--processes', is_flag=True,
+              help='Search batch chunks in worker processes instead of threads, for CPU-bound backends.')
+@click.option('--chunk-size', type=click.IntRange(min=1), default=32, show_default=True,
+              help='Candidates per batch search.')
+@click.option('--json', 'as_json', is_flag=True, help='Write a single query as a JSON line instead of one word per line.')
+def main(letters, batch, use_all_letters, min_match_length, limit_length, top_k, scorer, frequency_path, pattern,
+         phrases, max_words, min_word_length, max_results, backend, wordlist, config, workers, processes, chunk_size,
+         as_json):
+    """
+    Find the words that can be made from candidate letters.
+
+    Give --letters for one query, or --batch for many. Batch mode streams one JSON line per query to stdout as each
+    completes, and exits with status 1 if any query failed. With --phrases, the phrases of --letters are written
+    one per line as they are found. With --pattern, only the words that fit the pattern are matched, and --letters
+    may be left out.
+    """
+    if pattern is not None:
+        if batch is not None or phrases or top_k is not None:
+            raise click.UsageError('--pattern does not work with --batch, --phrases or --top-k.')
+        letters = letters or ''
+    elif (letters is None) == (batch is None):
+        raise click.UsageError('give exactly one of --letters and --batch.')
+    if phrases and batch is not None:
+        raise click.UsageError('--phrases works with --letters only.')
+    core_kwargs = core_options(wordlist, config, backend, frequency_path)
+    core = WordDescramblerCore(**core_kwargs)
+    options = search_options(use_all_letters, min_match_length, limit_length, top_k, scorer)
+    try:
+        if top_k is not None:
+            try:
+                core.get_scorer(scorer) if scorer is not None else core.scorer
+            except ValueError as e:
+                raise click.UsageError(str(e))
+        if batch is not None:
+            failed = False
+            for result in run_batch(core, read_candidates(batch), options, workers, chunk_size,
+                                    core_kwargs if processes else None):
+                failed = failed or 'error' in result
+                sys.stdout.write(json.dumps(result) + '\n')
+                sys.stdout.flush()
+            sys.exit(1 if failed else 0)
+
+        if len(letters) > core.MAX_CANDIDATE_LENGTH:
+            raise click.BadParameter(f'Max characters supported is {core.MAX_CANDIDATE_LENGTH}', param_hint='--letters')
+        if phrases:
+            if core.index.count_blanks(letters):
+                raise click.BadParameter('phrases cannot have blanks', param_hint='--letters')
+            for phrase in core.iter_phrases(letters, max_words, min_word_length, max_results):
+                click.echo(json.dumps({'letters': letters, 'phrase': list(phrase)}) if as_json else ' '.join(phrase))
+            return
+        start = time.perf_counter()
+        if pattern is not None:
+            try:
+                result = match_result(sorted(core.match_pattern(pattern, letters, **options)), False)
+            except ValueError as e:
+                raise click.BadParameter(str(e), param_hint='--pattern')
+            result = {'pattern': pattern, **result}
+        else:
+            result = match_result(find_matches(core, [letters], options)[letters], top_k is not None)
+        if as_json:
+            click.echo(json.dumps({'letters': letters, **result, 'seconds': time.perf_counter() - start}))
+        else:
+            for match in result['matches']:
+                click.echo(match)
+    finally:
+        core.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+import sys
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+# the package modules import each other as siblings, the way the scripts in it are run
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'WordDescrambler'))
+
+from WordDescramblerCore import WordDescramblerCore
+from WordIndex import WordIndex
+
+WORDS = ['act', 'cat', 'tac', 'at', 'ta', 'a', 'cast', 'cats', 'scat', 'acts', 'coat', 'taco', 'coast', 'tacos',
+         'coats', 'ascot', 'costa', 'east', 'eats', 'seat', 'teas', 'sate', 'tease', 'setae', 'listen', 'silent',
+         'enlist', 'tinsel', 'inlets', 'tile', 'lite', 'stile', 'islet', 'tiles', 'nest', 'sent', 'tens', 'net',
+         'ten', 'tin', 'nit', 'lint', 'ice', 'man', 'cinema', 'anemic', 'iceman', 'mace', 'came', 'acme', 'mine',
+         'nice', 'cane', 'mica', 'dog', 'god', 'good', 'zoo', 'ooze', 'banana', 'nab', 'ban', 'bandana']
+
+OPEN_POSITIONS = '_?.'
+
+
+def fits(word: str, letters: str) -> bool:
+    """
+    :return: True if the word can be built from the letters, each wildcard standing for any one letter.
+    """
+    missing = Counter(word) - Counter(letters)
+    return sum(missing.values()) <= letters.count(WordIndex.WILDCARD)
+
+
+def brute_force(letters: str, min_length: int = 1, max_length: int = None, use_all_letters: bool = False) -> set:
+    """
+    :return: The fixture words that can be built from the letters, checked one by one.
+    """
+    if use_all_letters:
+        min_length = max_length = len(letters)
+    return {word for word in WORDS
+            if len(word) >= min_length and not (max_length and len(word) > max_length) and fits(word, letters)}
+
+
+def blank_letters(word: str, letters: str) -> str:
+    """
+    :return: The letters of the word the wildcards in the letters stand for, in alphabetical order.
+    """
+    return ''.join(sorted((Counter(word) - Counter(letters)).elements()))
+
+
+@pytest.fixture
+def wordlist_path(tmp_path) -> Path:
+    path = tmp_path / 'words.txt'
+    path.write_text('\n'.join(WORDS) + '\n')
+    return path
+
+
+@pytest.fixture
+def make_core(tmp_path, wordlist_path):
+    """
+    :return: A factory of WordDescramblerCore instances searching the fixture wordlist, with a config file, runtime
+        file and caches of their own under tmp_path. Keyword arguments override the defaults.
+    """
+    cores = []
+
+    def make(candidate_letters: str = '', **kwargs):
+        settings = {'config_full_file_location': str(tmp_path / 'config.ini'),
+                    'path_to_wordlist': wordlist_path, 'rt_save_file_path': str(tmp_path / 'runtime.txt'),
+                    'print_matches': False, 'min_match_length': 1, 'result_cache_size': 0, 'wordlist_cache_dir': '',
+                    'share_wordlists': False, 'num_threads': 2, **kwargs}
+        core = WordDescramblerCore(candidate_letters, **settings)
+        cores.append(core)
+        return core
+
+    yield make
+    for core in cores:
+        core.close()
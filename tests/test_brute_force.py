@@ -0,0 +1,173 @@
+"""
+Every way of searching the index, checked against a brute-force reference over the fixture wordlist.
+"""
+from collections import Counter
+
+import pytest
+
+from conftest import WORDS, OPEN_POSITIONS, blank_letters, brute_force, fits
+from Scoring import LengthScorer, TileScorer
+from SearchBackends import NumpySearchBackend
+from WordIndex import WordIndex
+from WordlistCache import WordlistCache
+
+BACKENDS = ['auto', 'python', 'trie', 'process',
+            pytest.param('numpy', marks=pytest.mark.skipif(not NumpySearchBackend.is_available(),
+                                                           reason='numpy is not installed'))]
+CANDIDATES = ['coast', 'listen', 'tacos', 'cat?', 'ta', 'a??', 'bandanaz', 'cinemat']
+OPTIONS = [{'use_all_letters': False, 'min_match_length': 1, 'limit_length': 0},
+           {'use_all_letters': False, 'min_match_length': 3, 'limit_length': 4},
+           {'use_all_letters': True, 'min_match_length': 1, 'limit_length': 0}]
+
+
+def brute_force_options(letters: str, use_all_letters: bool, min_match_length: int, limit_length: int) -> set:
+    if len(letters) < min_match_length:
+        return set()
+    return brute_force(letters, min_match_length, limit_length or None, use_all_letters)
+
+
+def brute_force_ranked(letters: str, top_k: int, scorer, **options) -> list:
+    scores = {word: scorer.score(word, blank_letters(word, letters)) for word in brute_force_options(letters, **options)}
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+
+
+def brute_force_pattern(pattern: str, letters: str = '', use_all_letters: bool = False, min_length: int = 1) -> set:
+    open_positions = [position for position, character in enumerate(pattern) if character in OPEN_POSITIONS]
+    if len(pattern) < min_length or (letters and use_all_letters and len(open_positions) != len(letters)):
+        return set()
+    return {word for word in WORDS
+            if len(word) == len(pattern)
+            and all(pattern[position] in OPEN_POSITIONS or pattern[position] == letter
+                    for position, letter in enumerate(word))
+            and (not letters or fits(''.join(word[position] for position in open_positions), letters))}
+
+
+def brute_force_phrases(letters: str, max_words: int, min_word_length: int) -> set:
+    words = sorted({word for word in WORDS if len(word) >= min_word_length and fits(word, letters)})
+    phrases = set()
+
+    def extend(phrase: tuple, remaining: Counter, start: int):
+        if not sum(remaining.values()):
+            phrases.add(tuple(sorted(phrase)))
+            return
+        if len(phrase) == max_words:
+            return
+        for position in range(start, len(words)):
+            word_counts = Counter(words[position])
+            if not word_counts - remaining:
+                extend(phrase + (words[position],), remaining - word_counts, position)
+
+    extend((), Counter(letters), 0)
+    return phrases
+
+
+def index_columns(index: WordIndex) -> tuple:
+    return (list(index.words), [bytes(index.counts[row]) for row in range(len(index))], list(index.masks),
+            list(index.lengths), list(index.signature_order), list(index.length_order), list(index.length_starts))
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('options', OPTIONS)
+@pytest.mark.parametrize('letters', CANDIDATES)
+def test_search_and_iter_matches(make_core, backend, options, letters):
+    expected = brute_force_options(letters, **options)
+    wd = make_core(letters, search_backend=backend, **options)
+    if len(letters) < options['min_match_length']:
+        with pytest.raises(ValueError):
+            wd.search()
+        return
+    wd.search()
+    assert wd.match_list == expected
+    assert set(wd.iter_matches()) == expected
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('options', OPTIONS)
+def test_search_many(make_core, backend, options):
+    wd = make_core(search_backend=backend)
+    results = wd.search_many(CANDIDATES, **options)
+    assert results == {letters: brute_force_options(letters, **options) for letters in CANDIDATES}
+
+
+def test_result_cache_returns_the_same_matches(make_core):
+    wd = make_core('tacos', result_cache_size=16)
+    wd.search()
+    wd.search()
+    assert wd.match_list == brute_force('tacos')
+    assert wd.result_cache.hits == 1
+    assert wd.search_many(['coats', 'tacos']) == {'coats': brute_force('coats'), 'tacos': brute_force('tacos')}
+
+
+@pytest.mark.parametrize('backend', ['python', 'numpy'])
+@pytest.mark.parametrize('scorer', [LengthScorer(), TileScorer()])
+@pytest.mark.parametrize('options', OPTIONS)
+@pytest.mark.parametrize('letters', CANDIDATES)
+def test_top_matches(make_core, backend, scorer, options, letters):
+    wd = make_core(search_backend=backend)
+    for top_k in (1, 3, 50):
+        assert wd.top_matches(letters, top_k, scorer, **options) == brute_force_ranked(letters, top_k, scorer,
+                                                                                      **options)
+
+
+@pytest.mark.parametrize('pattern, letters', [('c_t', ''), ('c_t', 'a'), ('c?t', 'oa'), ('_a__', 'ocst'),
+                                              ('t__', 'a?'), ('_a__', 'cst'), ('?????', ''), ('s.a.', 'et'), ('zz?', '')])
+@pytest.mark.parametrize('use_all_letters', [False, True])
+def test_pattern_search(make_core, pattern, letters, use_all_letters):
+    expected = brute_force_pattern(pattern, letters, use_all_letters)
+    wd = make_core(use_all_letters=use_all_letters)
+    assert wd.match_pattern(pattern, letters) == expected
+    wd = make_core(letters, pattern=pattern, use_all_letters=use_all_letters)
+    wd.search()
+    assert wd.match_list == expected
+    assert set(wd.iter_matches()) == expected
+
+
+@pytest.mark.parametrize('letters', ['cinema', 'tacocat', 'cinemacat', 'listensilent'])
+@pytest.mark.parametrize('max_words, min_word_length', [(3, 3), (2, 1), (0, 2)])
+def test_phrases(make_core, letters, max_words, min_word_length):
+    wd = make_core()
+    phrases = list(wd.iter_phrases(letters, max_words, min_word_length))
+    assert len(phrases) == len(set(phrases))
+    assert {tuple(sorted(phrase)) for phrase in phrases} == brute_force_phrases(letters, max_words or len(letters),
+                                                                                min_word_length)
+
+
+@pytest.mark.parametrize('added, removed', [(['cot', 'zebra', 'a'], []), ([], ['cat', 'banana', 'missing']),
+                                            (['tacocat', 'ooze'], ['ooze', 'dog', 'a']), ([], [])])
+def test_updated_matches_a_rebuild(added, removed):
+    index = WordIndex(WORDS)
+    expected = (set(WORDS) | set(added)) - (set(removed) - set(added))
+    assert index_columns(index.updated(added, removed)) == index_columns(WordIndex(expected))
+
+
+def test_updated_index_is_searched_like_a_rebuild(make_core):
+    wd = make_core('tacos')
+    wd.add_words(['cost', 'scot'])
+    wd.remove_words(['cat', 'taco'])
+    wd.search()
+    assert wd.match_list == (brute_force('tacos') | {'cost', 'scot'}) - {'cat', 'taco'}
+
+
+def test_subset_matches_a_rebuild():
+    index = WordIndex(WORDS)
+    rows = [row for row in range(len(index)) if index.words[row] < 'm' or len(index.words[row]) == 4]
+    assert index_columns(index.subset(rows)) == index_columns(WordIndex(index.words[row] for row in rows))
+
+
+def test_compiled_wordlist_round_trip(tmp_path):
+    index = WordIndex(WORDS)
+    cache = WordlistCache(tmp_path)
+    key = {'source': 'test'}
+    cache.save(index, key)
+    loaded = cache.load(key, lambda: pytest.fail('the compiled wordlist was not used'))
+    assert index_columns(loaded) == index_columns(index)
+
+
+@pytest.mark.parametrize('backend', ['python', 'trie', 'numpy'])
+def test_search_from_compiled_wordlist(make_core, tmp_path, backend):
+    settings = {'wordlist_cache_dir': str(tmp_path / 'cache'), 'search_backend': backend}
+    make_core('coast', **settings).index
+    wd = make_core('coast', **settings)
+    wd.search()
+    assert wd.match_list == brute_force('coast')
+    assert len(list((tmp_path / 'cache').glob(f'*{WordlistCache.SUFFIX}'))) == 1
@@ -0,0 +1,66 @@
+import multiprocessing
+
+from ResultCache import ResultCache
+
+
+def _fill(disk_path: str, worker: int):
+    cache = ResultCache(0, disk_path)
+    for n in range(50):
+        cache.put(f'{worker}-{n}', {f'word{n}'})
+    cache.close()
+
+
+def test_disk_tier_survives_restarts(tmp_path):
+    cache = ResultCache(4, tmp_path / 'results')
+    cache.put('key', {'cat', 'act'})
+    cache.close()
+    cache = ResultCache(4, tmp_path / 'results')
+    assert cache.get('key') == {'cat', 'act'}
+    assert cache.disk_hits == 1
+    assert cache.get('key') == {'cat', 'act'}
+    assert cache.hits == 1
+
+
+def test_invalidate_only_clears_memory(tmp_path):
+    cache = ResultCache(4, tmp_path / 'results')
+    cache.put('key', {'cat'})
+    cache.invalidate()
+    assert cache.get('key') == {'cat'}
+    assert cache.disk_hits == 1
+
+
+def test_processes_share_the_disk_tier(tmp_path):
+    disk_path = str(tmp_path / 'results')
+    ResultCache(0, disk_path).close()
+    processes = [multiprocessing.Process(target=_fill, args=(disk_path, worker)) for worker in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert all(process.exitcode == 0 for process in processes)
+    cache = ResultCache(0, disk_path)
+    assert all(cache.get(f'{worker}-{n}') == {f'word{n}'} for worker in range(4) for n in range(50))
+
+
+def test_file_of_another_format_is_replaced(tmp_path):
+    # such as the gdbm shelve file older versions kept at the same path
+    (tmp_path / 'results').write_bytes(b'\x13\x57\x9a\xce' + bytes(1020))
+    cache = ResultCache(4, tmp_path / 'results')
+    assert cache.get('key') is None
+    cache.put('key', {'cat'})
+    assert ResultCache(0, tmp_path / 'results').get('key') == {'cat'}
+
+
+def _put_inherited(cache: ResultCache):
+    cache.put('child', {'dog'})
+
+
+def test_forked_process_opens_its_own_connection(tmp_path):
+    cache = ResultCache(4, tmp_path / 'results')
+    cache.put('parent', {'cat'})
+    process = multiprocessing.get_context('fork').Process(target=_put_inherited, args=(cache,))
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+    assert cache.get('parent') == {'cat'}
+    assert cache.get('child') == {'dog'}
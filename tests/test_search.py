@@ -0,0 +1,34 @@
+import threading
+
+import pytest
+
+from conftest import brute_force
+
+
+@pytest.mark.parametrize('backend', ['python', 'trie'])
+def test_limit_length_longer_than_candidate_is_clamped(make_core, backend):
+    wd = make_core('cats', limit_length=10, search_backend=backend)
+    wd.search()
+    assert wd.match_list == brute_force('cats')
+    assert set(wd.iter_matches()) == brute_force('cats')
+
+
+def test_print_matches_returns_the_match_lines(make_core, capsys):
+    wd = make_core('cat', use_all_letters=True)
+    wd.search()
+    final_str = wd.print_matches(use_columns=False)
+    assert sorted(final_str.splitlines()) == ['\tact', '\tcat', '\ttac']
+    assert final_str in capsys.readouterr().out
+
+
+@pytest.mark.parametrize('settings', [{'search_backend': 'trie'}, {'search_backend': 'python'},
+                                      {'pattern': 'c??'}, {'top_k': 3}])
+def test_cancelled_iter_matches_stops_and_caches_nothing(make_core, settings):
+    wd = make_core('coast', result_cache_size=16, **settings)
+    cancel_event = threading.Event()
+    cancel_event.set()
+    assert list(wd.iter_matches(cancel_event=cancel_event)) == []
+    assert list(wd.iter_matches(timeout=0)) == []
+    streamed = set(wd.iter_matches())
+    wd.search()
+    assert streamed and streamed == wd.match_list
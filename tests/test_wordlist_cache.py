@@ -0,0 +1,37 @@
+import multiprocessing
+
+from itertools import product
+
+from conftest import WORDS
+from WordIndex import WordIndex
+from WordlistCache import WordlistCache
+
+
+# enough words that compiling them takes a while, so the processes below are all writing at once
+MANY_WORDS = WORDS + [''.join(letters) for letters in product('abcdefgh', repeat=5)]
+
+
+def _build(barrier) -> WordIndex:
+    index = WordIndex(MANY_WORDS)
+    barrier.wait()
+    return index
+
+
+def _load(cache_dir: str, barrier, results):
+    try:
+        results.put(len(WordlistCache(cache_dir).load({'source': 'test'}, lambda: _build(barrier))))
+    except Exception as e:
+        results.put(repr(e))
+
+
+def test_processes_compiling_one_source_at_once(tmp_path):
+    context = multiprocessing.get_context('fork')
+    barrier, results = context.Barrier(8), context.Queue()
+    processes = [context.Process(target=_load, args=(str(tmp_path), barrier, results)) for _ in range(8)]
+    for process in processes:
+        process.start()
+    loaded = [results.get(timeout=60) for _ in processes]
+    for process in processes:
+        process.join()
+    assert loaded == [len(set(MANY_WORDS))] * len(processes)
+    assert [path.suffix for path in tmp_path.iterdir()] == [WordlistCache.SUFFIX]